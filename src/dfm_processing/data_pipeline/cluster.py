@@ -1,16 +1,24 @@
 """Module containing methods for creating and managing a cluster of workers."""
 
+import atexit
 from typing import Callable
 from dask.distributed import Client, LocalCluster
+import distributed
 from distributed import Future
 
 
 from dfm_processing.data_pipeline.config import ClusterConfig
 
+# Clients are reused for identical configurations.
+_CLIENT_CACHE: dict[ClusterConfig, Client] = {}
+
 
 def create_client(config: ClusterConfig) -> Client:
     """Build a Dask Cluster Client based on desired configuration.
 
+    Clients are cached per configuration, so repeated calls reuse the same
+    scheduler connection (and local cluster) instead of creating a new one.
+
     Args:
         config: A configuration object defining the Dask cluster.
 
@@ -20,23 +28,116 @@ def create_client(config: ClusterConfig) -> Client:
     Returns:
         The Dask Client used to submit jobs.
     """
+    client = _CLIENT_CACHE.get(config)
+    if client is not None and client.status != "closed":
+        return client
+
     if config.type == "local" and config.n_workers:
+        # Keep native thread pools from spawning a thread per core in every worker.
+        n_threads = str(config.worker_threads)
         cluster = LocalCluster(
             name="LocalCluster DFM",
             n_workers=config.n_workers,
             threads_per_worker=config.worker_threads,
             host="localhost",
+            protocol=config.protocol,
+            env={
+                "OMP_NUM_THREADS": n_threads,
+                "MKL_NUM_THREADS": n_threads,
+                "OPENBLAS_NUM_THREADS": n_threads,
+                "RAYON_NUM_THREADS": n_threads,
+            },
         )
+        atexit.register(cluster.close)
         client = Client(cluster)
     elif config.type == "distributed" and config.scheduler_file:
         client = Client(scheduler_file=config.scheduler_file)
     elif config.type == "distributed" and not config.scheduler_file:
-        client = Client(address=f"{config.scheduler_host}:{config.scheduler_port}")
+        client = Client(
+            address=f"{config.protocol}://{config.scheduler_host}:{config.scheduler_port}"
+        )
     else:
         raise ValueError(f"Something in your configuration is wrong: {config}")
+    atexit.register(client.close)
+    _CLIENT_CACHE[config] = client
     return client
 
 
-def submit_job(client: Client, job: Callable, *args):
-    future: Future = client.submit(job, *args)
+def submit_job(
+    client: Client,
+    job: Callable,
+    *args,
+    key: str | None = None,
+    pure: bool = False,
+    retries: int | None = None,
+    **kwargs,
+) -> Future:
+    """Submit a single job to the cluster.
+
+    Args:
+        client: The Dask Client to submit the job with.
+        job: The function to run.
+        *args: Positional arguments for the job.
+        key: Key of the task on the scheduler. Defaults to None, which gives a
+            unique key.
+        pure: Whether the job is a pure function. Pure jobs are keyed by a hash
+            of the function and its arguments, which has to be computed on every
+            submission. Defaults to False.
+        retries: Number of times the job is rerun if it fails on a worker, e.g. when
+            the worker is lost. Defaults to None, i.e. no retries.
+        **kwargs: Keyword arguments for the job.
+
+    Returns:
+        The future of the submitted job.
+    """
+    future: Future = client.submit(
+        job, *args, key=key, pure=pure, retries=retries, **kwargs
+    )
     return future
+
+
+def fire_and_forget_job(client: Client, job: Callable, *args, **kwargs) -> None:
+    """Submit a job and let the scheduler run it without holding on to its future.
+
+    The result is released as soon as the job finishes.
+
+    Args:
+        client: The Dask Client to submit the job with.
+        job: The function to run.
+        *args: Positional arguments for the job.
+        **kwargs: Keyword arguments passed on to `submit_job`.
+    """
+    distributed.fire_and_forget(submit_job(client, job, *args, **kwargs))
+
+
+def submit_jobs(
+    client: Client,
+    job: Callable,
+    *iterables,
+    batch_size: int = 64,
+    pure: bool = False,
+    **shared,
+) -> list[Future]:
+    """Submit a job once for every set of arguments in `iterables`.
+
+    The tasks are sent to the scheduler in batches, instead of one round-trip
+    per task as with `submit_job`.
+
+    Args:
+        client: The Dask Client to submit the jobs with.
+        job: The function to run.
+        *iterables: Iterables of positional arguments, one element per job.
+        batch_size: Number of tasks to submit per scheduler call. Defaults to 64.
+        pure: Whether the job is a pure function. Pure jobs with the same arguments
+            share one task, so leave this off for jobs with side effects, such as
+            pipeline executors. Defaults to False.
+        **shared: Keyword arguments passed to every job. They are scattered to all
+            workers once, instead of being serialized with every task.
+
+    Returns:
+        The futures of the submitted jobs.
+    """
+    if shared:
+        futures = client.scatter(list(shared.values()), broadcast=True)
+        shared = dict(zip(shared.keys(), futures))
+    return client.map(job, *iterables, batch_size=batch_size, pure=pure, **shared)
@@ -0,0 +1,36 @@
+from datatrove.data import Document, DocumentsPipeline
+from datatrove.pipeline.filters.base_filter import BaseFilter
+from datatrove.pipeline.writers.disk_base import DiskWriter
+from xxhash import xxh3_64_intdigest
+
+
+class ExactDedupFilter(BaseFilter):
+    """Drops documents whose text has already been seen by the same task.
+
+    Each text is hashed with 64-bit xxh3, and every task keeps the hashes it
+    has seen in a set, so a repeated document costs a single hash and set lookup
+    instead of the full sentence dedup signature. Whether a document is dropped
+    only depends on the documents read before it by the same task, so the same
+    documents are dropped every time the same input is read. Sentence
+    deduplication relies on this, as its signature and filter stages both have
+    to see the same documents in the same order.
+    """
+
+    name = "🎯 Exact dedup"
+
+    def __init__(self, exclusion_writer: DiskWriter = None):
+        super().__init__(exclusion_writer=exclusion_writer)
+        self._seen: set[int] = set()
+
+    def filter(self, doc: Document) -> bool | tuple[bool, str]:
+        digest = xxh3_64_intdigest(doc.text.encode())
+        if digest in self._seen:
+            return False, "exact_duplicate"
+        self._seen.add(digest)
+        return True
+
+    def run(
+        self, data: DocumentsPipeline, rank: int = 0, world_size: int = 1
+    ) -> DocumentsPipeline:
+        self._seen = set()
+        yield from super().run(data, rank, world_size)
@@ -0,0 +1,30 @@
+import re
+
+from datatrove.pipeline.formatters import FTFYFormatter
+
+# Printable ASCII, tab, line feed, form feed and carriage return, but not "&" which can
+# start an HTML entity. ftfy leaves text made of only these characters as it is.
+_UNCHANGED_TEXT = re.compile(r"[\t\n\x0c\r\x20-\x25\x27-\x7e]*")
+# The same without carriage returns, which are replaced when fixing line breaks.
+_UNCHANGED_TEXT_FIXED_LINE_BREAKS = re.compile(r"[\t\n\x0c\x20-\x25\x27-\x7e]*")
+
+
+class FastFTFYFormatter(FTFYFormatter):
+    """FTFYFormatter that skips ftfy for text it would not change.
+
+    Plain ASCII text without HTML entities, terminal escapes or control characters
+    has nothing for ftfy to fix. That is checked with a single regular expression
+    scan, which is a lot cheaper than running all of ftfy's fixes on the text.
+    """
+
+    name = "😎 FTFY (fast)"
+
+    def format(self, text: str) -> str:
+        unchanged_text = (
+            _UNCHANGED_TEXT_FIXED_LINE_BREAKS
+            if self.config.fix_line_breaks
+            else _UNCHANGED_TEXT
+        )
+        if unchanged_text.fullmatch(text):
+            return text
+        return super().format(text)
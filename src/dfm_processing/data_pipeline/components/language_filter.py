@@ -0,0 +1,39 @@
+from typing import Literal
+
+from datatrove.pipeline.filters import LanguageFilter
+from datatrove.pipeline.writers.disk_base import DiskWriter
+
+
+class TopLanguageFilter(LanguageFilter):
+    """LanguageFilter that only asks the model for the most likely language.
+
+    datatrove's LanguageFilter makes fastText return the scores of all (176 for
+    ft176) languages for every document, and then builds a dict from them. A
+    language with a score above 0.5 is always the most likely one, so with a
+    threshold of at least 0.5 the top prediction decides whether a document is kept,
+    and the metadata only ever holds the top language and its score. In that case
+    only the top prediction is computed, giving the same results for a lot less
+    work per document.
+    """
+
+    name = "🌍 Language ID (top)"
+
+    def __init__(
+        self,
+        languages: list[str] | str | None = None,
+        language_threshold: float = 0.65,
+        exclusion_writer: DiskWriter = None,
+        backend: Literal["ft176", "glotlid"] = "ft176",
+        label_only: bool = False,
+        keep_top_pairs_threshold: float = -1,
+    ):
+        super().__init__(
+            languages=languages,
+            language_threshold=language_threshold,
+            exclusion_writer=exclusion_writer,
+            backend=backend,
+            label_only=label_only,
+            keep_top_pairs_threshold=keep_top_pairs_threshold,
+        )
+        if language_threshold >= 0.5 and keep_top_pairs_threshold == -1:
+            self.model.k = 1
@@ -0,0 +1,37 @@
+from datatrove.data import Document
+from datatrove.pipeline.filters.base_filter import BaseFilter
+from datatrove.pipeline.writers.disk_base import DiskWriter
+
+
+class LengthFilter(BaseFilter):
+    """Drops documents by their number of characters.
+
+    Only needs `len(doc.text)`, so placed before the regex and tokenizer based
+    filters it removes documents that are bound to fail them at almost no cost.
+
+    Args:
+        min_chars: Minimum number of characters to keep a document.
+        max_chars: Maximum number of characters to keep a document. Defaults to
+            None for no limit.
+        exclusion_writer: Writer saving the dropped documents. Defaults to None.
+    """
+
+    name = "📏 Length"
+
+    def __init__(
+        self,
+        min_chars: int = 0,
+        max_chars: int | None = None,
+        exclusion_writer: DiskWriter = None,
+    ):
+        super().__init__(exclusion_writer=exclusion_writer)
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+
+    def filter(self, doc: Document) -> bool | tuple[bool, str]:
+        n_chars = len(doc.text)
+        if n_chars < self.min_chars:
+            return False, "too_short"
+        if self.max_chars is not None and n_chars > self.max_chars:
+            return False, "too_long"
+        return True
@@ -1,9 +1,184 @@
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+import io
 import json
 from typing import IO, Any, Callable, Literal
 
 from datatrove.io import DataFolderLike
 from datatrove.pipeline.writers.disk_base import DiskWriter
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+Compression = Literal["snappy", "gzip", "brotli", "lz4", "zstd"]
+
+# zstd level 3 gives much smaller files than snappy for text at a modest CPU cost.
+DEFAULT_COMPRESSION: Compression = "zstd"
+DEFAULT_ZSTD_LEVEL = 3
+
+# Default bounds on the data buffered per open file before it is written as a row
+# group. A task has several files open (output and exclusion writers), so the byte
+# bound keeps memory in check for long documents, and keeps `max_file_size` checks
+# reasonably fine-grained.
+DEFAULT_ROW_GROUP_SIZE = 8 * 1024
+DEFAULT_ROW_GROUP_BYTES = 16 << 20  # 16MB
+
+# Size of the buffer between a file writer and its output file, so that the many small
+# writes of page and column chunk headers don't each reach the file system.
+WRITE_BUFFER_SIZE = 8 << 20  # 8MB
+
+
+def validate_compression(
+    compression: Compression | dict[str, Compression] | None,
+    compression_level: int | dict[str, int] | None,
+) -> int | dict[str, int] | None:
+    """Validate a parquet compression setting and resolve its compression level.
+
+    Args:
+        compression: A codec, or a mapping from column name to codec.
+        compression_level: The codec level, or a mapping from column name to level.
+
+    Raises:
+        ValueError: The compression type is not supported.
+
+    Returns:
+        The compression level to use. Defaults to level 3 for zstd.
+    """
+    codecs = compression.values() if isinstance(compression, dict) else [compression]
+    if any(
+        codec not in {"snappy", "gzip", "brotli", "lz4", "zstd", None}
+        for codec in codecs
+    ):
+        raise ValueError(
+            "Invalid compression type. Allowed types are 'snappy', 'gzip', 'brotli', 'lz4', 'zstd', or None."
+        )
+    if compression_level is None and compression == "zstd":
+        return DEFAULT_ZSTD_LEVEL
+    return compression_level
+
+
+def column_to_array(values: list, typ: pa.DataType) -> pa.Array:
+    """Convert a buffered column to an Arrow array of the given type.
+
+    Integer and floating point columns without nulls are first collected into a
+    numpy array, which Arrow takes over without scanning the Python objects again.
+    Other columns, and numeric columns numpy can't store as numbers, are converted
+    by Arrow directly.
+
+    Args:
+        values: The column values.
+        typ: The Arrow type of the column.
+
+    Returns:
+        The column as an Arrow array.
+    """
+    if (pa.types.is_integer(typ) or pa.types.is_floating(typ)) and None not in values:
+        array = np.array(values)
+        # Only take the numpy array if all values were numbers, e.g. not booleans
+        # or strings, and integers for an integer column.
+        if array.dtype.kind in ("iu" if pa.types.is_integer(typ) else "iuf"):
+            return pa.array(array, type=typ)
+    return pa.array(values, type=typ, from_pandas=False)
+
+
+def _make_splitter(names: tuple[str, ...]) -> Callable[[dict, dict, int], None]:
+    """Build a function that stores a document's fields in column buffers.
+
+    Once the schema of a file is known, every document is split into the same
+    columns, so the split loops over the schema's column names instead of the
+    document's items.
+
+    Args:
+        names: The column names of the schema.
+
+    Returns:
+        A function `split(document, columns, row)` that sets `columns[name][row]` to
+        the document's value for every column, or None if it is missing. It raises a
+        ValueError if the document has fields outside the schema, as those can't be
+        written to the file.
+    """
+    known = frozenset(names)
+
+    def split(document: dict, columns: dict, row: int) -> None:
+        if not document.keys() <= known:
+            extra = sorted(document.keys() - known)
+            raise ValueError(
+                f"Document has fields {extra} that are not in the file's schema, "
+                "which was fixed by the first batch written to it."
+            )
+        get = document.get
+        for name in names:
+            columns[name][row] = get(name)
+
+    return split
+
+
+def _nullable_value_field(field):
+    """Rebuild the value field of a list-like type as nullable.
+
+    If the inner type is null (which can happen if the list only contains nulls),
+    assume it should be a string (adjust this if you expect another type).
+    """
+    if pa.types.is_null(field.type):
+        return pa.field(field.name, pa.string(), nullable=True)
+    return pa.field(field.name, make_nullable_type(field.type), nullable=True)
+
+
+def _nullable_struct(typ):
+    # For struct types, rebuild each child field recursively.
+    return pa.struct(
+        [
+            pa.field(field.name, make_nullable_type(field.type), nullable=True)
+            for field in typ
+        ]
+    )
+
+
+def _nullable_map(typ):
+    # Map keys can never be null, so only the items are rebuilt.
+    return pa.map_(
+        typ.key_type,
+        pa.field(typ.item_field.name, make_nullable_type(typ.item_type), nullable=True),
+        keys_sorted=typ.keys_sorted,
+    )
+
+
+# Nested types that need rebuilding, by type id. All other types are returned as is.
+_NULLABLE_TYPE_HANDLERS: dict[int, Callable] = {
+    pa.lib.Type_LIST: lambda typ: pa.list_(_nullable_value_field(typ.value_field)),
+    pa.lib.Type_LARGE_LIST: lambda typ: pa.large_list(
+        _nullable_value_field(typ.value_field)
+    ),
+    pa.lib.Type_FIXED_SIZE_LIST: lambda typ: pa.list_(
+        _nullable_value_field(typ.value_field), typ.list_size
+    ),
+    pa.lib.Type_STRUCT: _nullable_struct,
+    pa.lib.Type_MAP: _nullable_map,
+}
+
+
+def make_nullable_type(typ):
+    """
+    Recursively rebuilds a PyArrow type so that for list, map and struct types
+    all inner elements/fields are marked as nullable. For list types, if the
+    inner type is inferred as null, default it to pa.string(), which is often
+    the expected type.
+    """
+    handler = _NULLABLE_TYPE_HANDLERS.get(typ.id)
+    return handler(typ) if handler else typ
+
+
+def make_nullable_schema(schema):
+    """
+    Takes an existing schema and returns a new one with all fields (and
+    their nested elements, if applicable) marked as nullable.
+    """
+    return pa.schema(
+        [
+            pa.field(field.name, make_nullable_type(field.type), nullable=True)
+            for field in schema
+        ]
+    )
 
 
 class NullableParquetWriter(DiskWriter):
@@ -15,16 +190,29 @@ class NullableParquetWriter(DiskWriter):
         self,
         output_folder: DataFolderLike,
         output_filename: str | None = None,
-        compression: Literal["snappy", "gzip", "brotli", "lz4", "zstd"] | None = None,
+        compression: Compression | dict[str, Compression] | None = DEFAULT_COMPRESSION,
+        compression_level: int | dict[str, int] | None = None,
+        use_dictionary: bool | list[str] = True,
+        use_byte_stream_split: bool | list[str] = False,
+        column_encoding: dict[str, str] | None = None,
+        write_statistics: bool | list[str] = True,
+        data_page_size: int = 1 << 20,
         adapter: Callable | None = None,
         batch_size: int = 1000,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
         expand_metadata: bool = False,
         max_file_size: int = 5 * 2**30,  # 5GB
+        write_threads: int | None = None,
+        intermediate: bool = False,
+        max_open_files: int | None = None,
     ):
         # Validate the compression setting
-        if compression not in {"snappy", "gzip", "brotli", "lz4", "zstd", None}:
+        compression_level = validate_compression(compression, compression_level)
+        if max_open_files is not None and max_file_size <= 0:
             raise ValueError(
-                "Invalid compression type. Allowed types are 'snappy', 'gzip', 'brotli', 'lz4', 'zstd', or None."
+                "`max_open_files` requires `max_file_size`, as closed files are "
+                "continued in a new numbered file."
             )
 
         super().__init__(
@@ -37,13 +225,52 @@ class NullableParquetWriter(DiskWriter):
             max_file_size=max_file_size,
         )
         self._writers: dict = {}
-        self._batches: defaultdict = defaultdict(list)
+        # Nullable target schema of each file: filename -> schema
+        self._schemas: dict = {}
+        # Compiled functions splitting documents into the columns of the schema
+        self._splitters: dict = {}
+        # Documents are buffered column-wise in lists preallocated to `batch_size`:
+        # filename -> field name -> values
+        self._batches: defaultdict = defaultdict(dict)
+        self._batch_rows: Counter = Counter()
         self._file_counter: Counter = Counter()
-        self.compression: Literal["snappy", "gzip", "brotli", "lz4", "zstd"] | None = (
-            compression
-        )
+        self.compression: Compression | dict[str, Compression] | None = compression
+        self.compression_level: int | dict[str, int] | None = compression_level
+        # Intermediate files are read back once and then deleted, so skip the
+        # statistics, dictionary pages and Arrow schema only useful for later reads.
+        self.intermediate: bool = intermediate
+        if intermediate:
+            use_dictionary = False
+            write_statistics = False
+        # Encoding options passed on to `pyarrow.parquet.ParquetWriter`
+        self.use_dictionary: bool | list[str] = use_dictionary
+        self.use_byte_stream_split: bool | list[str] = use_byte_stream_split
+        self.column_encoding: dict[str, str] | None = column_encoding
+        self.write_statistics: bool | list[str] = write_statistics
+        self.data_page_size: int = data_page_size
         self.batch_size: int = batch_size
-        self._file_handlers: dict = {}
+        # A row group is written once either bound is reached.
+        self.row_group_size: int = row_group_size
+        self.row_group_bytes: int = row_group_bytes
+        # Record batches waiting to be written as one row group: filename -> batches
+        self._row_groups: defaultdict = defaultdict(list)
+        self._row_group_rows: Counter = Counter()
+        self._row_group_bytes: Counter = Counter()
+        # Open files in least recently written order, bounded by `max_open_files`.
+        # A parquet file can't be reopened for appending, so writes to a file that
+        # was closed continue in the next numbered file.
+        self._file_handlers: OrderedDict = OrderedDict()
+        self.max_open_files: int | None = max_open_files
+        self._buffers: dict[str, io.BufferedWriter] = {}
+        # With `write_threads`, row groups are encoded and compressed on a thread pool,
+        # so that writes to different files overlap. This is only done for local
+        # files: the main thread checks the file size while the pool writes to it,
+        # which remote file objects don't support. Otherwise, and by default, row
+        # groups are written synchronously. The pool is created on first use, as the
+        # writer has to stay picklable until it runs.
+        self.write_threads: int | None = write_threads
+        self._pool: ThreadPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
 
     def _on_file_switch(self, original_name, old_filename, new_filename):
         """
@@ -54,100 +281,233 @@ class NullableParquetWriter(DiskWriter):
             old_filename: old full filename
             new_filename: new full filename
         """
-        self._writers.pop(original_name).close()
+        self._write_batch(original_name)
+        self._write_row_group(original_name)
+        self._wait_for_write(original_name)
+        self._close_writer(original_name)
+        self._file_handlers.pop(original_name, None)
         super()._on_file_switch(original_name, old_filename, new_filename)
 
-    def _write_batch(self, filename):
-        if not self._batches[filename]:
+    def _open_writer(self, file_handler: IO, schema):
+        return pq.ParquetWriter(
+            file_handler,
+            schema=schema,
+            compression=self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=self.use_dictionary,
+            use_byte_stream_split=self.use_byte_stream_split,
+            column_encoding=self.column_encoding,
+            write_statistics=self.write_statistics,
+            data_page_size=self.data_page_size,
+            write_page_index=False,
+            store_schema=not self.intermediate,
+        )
+
+    def _close_least_recent_file(self):
+        filename = next(iter(self._file_handlers))
+        old_filename = self._get_filename_with_file_id(filename)
+        self.file_id_counter[filename] += 1
+        self._on_file_switch(
+            filename, old_filename, self._get_filename_with_file_id(filename)
+        )
+
+    def _close_writer(self, filename):
+        self._writers.pop(filename).close()
+        # Flush the buffer, but leave closing the file itself to the output manager.
+        self._buffers.pop(filename).detach()
+
+    def _wait_for_write(self, filename):
+        if filename in self._pending:
+            self._pending.pop(filename).result()
+
+    def _write_table(self, writer, buffer: io.BufferedWriter, batches):
+        table = pa.Table.from_batches(batches)
+        writer.write_table(table, row_group_size=self.row_group_size)
+        # Flush once per row group, so the file size seen by `max_file_size` keeps up.
+        buffer.flush()
+
+    def _write_row_group(self, filename):
+        if not self._row_groups[filename]:
+            return
+
+        self._row_group_rows.pop(filename)
+        self._row_group_bytes.pop(filename, None)
+        batches = self._row_groups.pop(filename)
+        if not self.write_threads or not self.output_folder.is_local():
+            self._write_table(self._writers[filename], self._buffers[filename], batches)
             return
-        import pyarrow as pa
-        import pyarrow.parquet as pq
-
-        def make_nullable_type(typ):
-            """
-            Recursively rebuilds a PyArrow type so that for list and struct types
-            all inner elements/fields are marked as nullable. For list types, if the
-            inner type is inferred as null, default it to pa.string(), which is often
-            the expected type.
-            """
-            if pa.types.is_list(typ):
-                inner_field = typ.value_field
-                # If the inner type is null (which can happen if the list only contains nulls),
-                # assume it should be a string (adjust this if you expect another type).
-                if pa.types.is_null(inner_field.type):
-                    new_inner_field = pa.field(
-                        inner_field.name, pa.string(), nullable=True
-                    )
-                else:
-                    new_inner_field = pa.field(
-                        inner_field.name,
-                        make_nullable_type(inner_field.type),
-                        nullable=True,
-                    )
-                return pa.list_(new_inner_field)
-            elif pa.types.is_struct(typ):
-                # For struct types, rebuild each child field recursively.
-                new_fields = [
-                    pa.field(field.name, make_nullable_type(field.type), nullable=True)
-                    for field in typ
-                ]
-                return pa.struct(new_fields)
-            else:
-                # For other types, return as is.
-                return typ
-
-        def make_nullable_schema(schema):
-            """
-            Takes an existing schema and returns a new one with all fields (and
-            their nested elements, if applicable) marked as nullable.
-            """
-            return pa.schema(
-                [
-                    pa.field(field.name, make_nullable_type(field.type), nullable=True)
-                    for field in schema
-                ]
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.write_threads, thread_name_prefix="parquet-writer"
             )
+        # Only one write per file may be in flight, to keep its row groups in order.
+        self._wait_for_write(filename)
+        self._pending[filename] = self._pool.submit(
+            self._write_table,
+            self._writers[filename],
+            self._buffers[filename],
+            batches,
+        )
 
-        # Prepare the record batch from your documents.
-        batch = pa.RecordBatch.from_pylist(self._batches.pop(filename))
+    def _write_batch(self, filename):
+        n_rows = self._batch_rows.pop(filename, 0)
+        if not n_rows:
+            # Nothing buffered, or only the columns of a rejected document.
+            self._batches.pop(filename, None)
+            return
+        # Drop the unused tail of a partially filled batch.
+        columns = {
+            name: values if len(values) == n_rows else values[:n_rows]
+            for name, values in self._batches.pop(filename).items()
+        }
 
-        if filename not in self._writers:
+        if filename not in self._schemas:
             # Infer the initial schema from the first batch.
-            initial_schema = batch.schema
+            initial_schema = pa.RecordBatch.from_pydict(columns).schema
             # Build a schema that marks all fields (including nested ones) as nullable.
-            nullable_schema = make_nullable_schema(initial_schema)
-            self._writers[filename] = pq.ParquetWriter(
-                self._file_handlers[filename],
-                schema=nullable_schema,
-                compression=self.compression,
+            # It is computed once and kept for files split off by `max_file_size`.
+            self._schemas[filename] = make_nullable_schema(initial_schema)
+            self._splitters[filename] = _make_splitter(
+                tuple(self._schemas[filename].names)
             )
-        else:
-            # For subsequent batches, cast the batch to the writer's schema.
-            # This ensures that even if Arrow infers a different inner type (like null for an empty list),
-            # the batch is converted to match the existing file schema.
-            batch = batch.cast(self._writers[filename].schema)
+        schema = self._schemas[filename]
+
+        if filename not in self._writers:
+            self._buffers[filename] = io.BufferedWriter(
+                self._file_handlers[filename], buffer_size=WRITE_BUFFER_SIZE
+            )
+            self._writers[filename] = self._open_writer(self._buffers[filename], schema)
+
+        # Build every column directly at the writer's type, so that even if Arrow
+        # would infer a different inner type (like null for an empty list) the batch
+        # matches the existing file schema without a cast. Fields missing from this
+        # batch are filled with nulls.
+        arrays = [
+            column_to_array(columns.get(field.name, [None] * n_rows), field.type)
+            for field in schema
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
 
-        # Write the batch using the ParquetWriter.
-        self._writers[filename].write_batch(batch)
+        # Coalesce batches until a full row group is buffered, as every call to the
+        # ParquetWriter produces at least one (possibly tiny) row group.
+        self._row_groups[filename].append(batch)
+        self._row_group_rows[filename] += n_rows
+        self._row_group_bytes[filename] += batch.nbytes
+        if (
+            self._row_group_rows[filename] >= self.row_group_size
+            or self._row_group_bytes[filename] >= self.row_group_bytes
+        ):
+            self._write_row_group(filename)
 
     def _write(self, document: dict, file_handler: IO, filename: str):
         if filename not in self._file_handlers:
+            if self.max_open_files is not None:
+                while len(self._file_handlers) >= self.max_open_files:
+                    self._close_least_recent_file()
             self._file_handlers[filename] = file_handler
+        self._file_handlers.move_to_end(filename)
 
-        self._batches[filename].append(document)
-        if len(self._batches[filename]) == self.batch_size:
+        columns = self._batches[filename]
+        n_rows = self._batch_rows[filename]
+        if filename in self._splitters:
+            # The columns are fixed once the schema is known, and any other field
+            # would be dropped when the batch is written.
+            if not columns:
+                columns.update(
+                    (name, [None] * self.batch_size)
+                    for name in self._schemas[filename].names
+                )
+            self._splitters[filename](document, columns, n_rows)
+        else:
+            for key, value in document.items():
+                if key not in columns:
+                    # Fields missing from a document are left as the preallocated None.
+                    columns[key] = [None] * self.batch_size
+                columns[key][n_rows] = value
+        n_rows += 1
+        self._batch_rows[filename] = n_rows
+
+        if n_rows == self.batch_size:
             self._write_batch(filename)
 
     def close(self):
         for filename in list(self._batches.keys()):
             self._write_batch(filename)
-        for writer in self._writers.values():
-            writer.close()
+        for filename in list(self._row_groups.keys()):
+            self._write_row_group(filename)
+        for filename in list(self._pending.keys()):
+            self._wait_for_write(filename)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for filename in list(self._writers.keys()):
+            self._close_writer(filename)
         self._batches.clear()
+        self._batch_rows.clear()
+        self._schemas.clear()
+        self._splitters.clear()
+        self._row_groups.clear()
+        self._row_group_rows.clear()
+        self._row_group_bytes.clear()
         self._writers.clear()
+        self._file_handlers.clear()
         super().close()
 
 
+class NullableArrowIPCWriter(NullableParquetWriter):
+    """Write documents to Arrow IPC (Feather v2) files with a nullable schema.
+
+    Arrow IPC stores the in-memory columnar layout without Parquet's encoding step,
+    which makes it a lot cheaper to write. Use it for short-lived intermediate data
+    that is read back once, and Parquet for data that is kept.
+    """
+
+    default_output_filename: str = "${rank}.arrow"
+    name = "🏹 Arrow IPC (Nullable)"
+
+    def __init__(
+        self,
+        output_folder: DataFolderLike,
+        output_filename: str | None = None,
+        compression: Literal["lz4", "zstd"] | None = "lz4",
+        adapter: Callable | None = None,
+        batch_size: int = 1000,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        expand_metadata: bool = False,
+        max_file_size: int = 5 * 2**30,  # 5GB
+        write_threads: int | None = None,
+    ):
+        if compression not in {"lz4", "zstd", None}:
+            raise ValueError(
+                "Invalid compression type. Allowed types are 'lz4', 'zstd', or None."
+            )
+
+        super().__init__(
+            output_folder,
+            output_filename,
+            compression=None,
+            adapter=adapter,
+            batch_size=batch_size,
+            row_group_size=row_group_size,
+            row_group_bytes=row_group_bytes,
+            expand_metadata=expand_metadata,
+            max_file_size=max_file_size,
+            write_threads=write_threads,
+        )
+        self.compression = compression
+
+    def _open_writer(self, file_handler: IO, schema):
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(file_handler, schema, options=options)
+
+    def _write_table(self, writer, buffer: io.BufferedWriter, batches):
+        table = pa.Table.from_batches(batches)
+        writer.write_table(table, max_chunksize=self.row_group_size)
+        buffer.flush()
+
+
 class JSONParquetWriter(DiskWriter):
     default_output_filename: str = "${rank}.parquet"
     name = "📒 Parquet (JSON)"
@@ -157,18 +517,24 @@ class JSONParquetWriter(DiskWriter):
         self,
         output_folder: DataFolderLike,
         output_filename: str | None = None,
-        compression: Literal["snappy", "gzip", "brotli", "lz4", "zstd"] | None = None,
+        compression: Compression | dict[str, Compression] | None = DEFAULT_COMPRESSION,
+        compression_level: int | dict[str, int] | None = None,
+        use_dictionary: bool | list[str] = True,
+        use_byte_stream_split: bool | list[str] = False,
+        column_encoding: dict[str, str] | None = None,
+        write_statistics: bool | list[str] = True,
+        data_page_size: int = 1 << 20,
         adapter: Callable | None = None,
         batch_size: int = 1000,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
         expand_metadata: bool = False,
         max_file_size: int = 5 * 2**30,  # 5GB
         schema: Any = None,
+        intermediate: bool = False,
     ):
         # Validate the compression setting
-        if compression not in {"snappy", "gzip", "brotli", "lz4", "zstd", None}:
-            raise ValueError(
-                "Invalid compression type. Allowed types are 'snappy', 'gzip', 'brotli', 'lz4', 'zstd', or None."
-            )
+        compression_level = validate_compression(compression, compression_level)
 
         super().__init__(
             output_folder,
@@ -182,10 +548,28 @@ class JSONParquetWriter(DiskWriter):
         self._writers: dict = {}
         self._batches: defaultdict = defaultdict(list)
         self._file_counter: Counter = Counter()
-        self.compression: Literal["snappy", "gzip", "brotli", "lz4", "zstd"] | None = (
-            compression
-        )
+        self.compression: Compression | dict[str, Compression] | None = compression
+        self.compression_level: int | dict[str, int] | None = compression_level
+        # Intermediate files are read back once and then deleted, so skip the
+        # statistics, dictionary pages and Arrow schema only useful for later reads.
+        self.intermediate: bool = intermediate
+        if intermediate:
+            use_dictionary = False
+            write_statistics = False
+        # Encoding options passed on to `pyarrow.parquet.ParquetWriter`
+        self.use_dictionary: bool | list[str] = use_dictionary
+        self.use_byte_stream_split: bool | list[str] = use_byte_stream_split
+        self.column_encoding: dict[str, str] | None = column_encoding
+        self.write_statistics: bool | list[str] = write_statistics
+        self.data_page_size: int = data_page_size
         self.batch_size: int = batch_size
+        # A row group is written once either bound is reached.
+        self.row_group_size: int = row_group_size
+        self.row_group_bytes: int = row_group_bytes
+        # Record batches waiting to be written as one row group: filename -> batches
+        self._row_groups: defaultdict = defaultdict(list)
+        self._row_group_rows: Counter = Counter()
+        self._row_group_bytes: Counter = Counter()
         self.schema = schema
 
     def _on_file_switch(self, original_name, old_filename, new_filename):
@@ -197,25 +581,37 @@ class JSONParquetWriter(DiskWriter):
             old_filename: old full filename
             new_filename: new full filename
         """
+        self._write_batch(original_name)
+        self._write_row_group(original_name)
         self._writers.pop(original_name).close()
         super()._on_file_switch(original_name, old_filename, new_filename)
 
+    def _write_row_group(self, filename):
+        if not self._row_groups[filename]:
+            return
+        self._row_group_rows.pop(filename)
+        self._row_group_bytes.pop(filename, None)
+        table = pa.Table.from_batches(self._row_groups.pop(filename))
+        self._writers[filename].write_table(table, row_group_size=self.row_group_size)
+
     def _write_batch(self, filename):
         if not self._batches[filename]:
             return
-        import pyarrow as pa
-
         # prepare batch
         batch = pa.RecordBatch.from_pylist(
-            self._batches.pop(filename), schema=self.schema
+            self._batches.pop(filename), schema=self._writers[filename].schema
         )
-        # write batch
-        self._writers[filename].write_batch(batch)
+        # buffer batch until a full row group is collected
+        self._row_groups[filename].append(batch)
+        self._row_group_rows[filename] += batch.num_rows
+        self._row_group_bytes[filename] += batch.nbytes
+        if (
+            self._row_group_rows[filename] >= self.row_group_size
+            or self._row_group_bytes[filename] >= self.row_group_bytes
+        ):
+            self._write_row_group(filename)
 
     def _write(self, document: dict, file_handler: IO, filename: str):
-        import pyarrow as pa
-        import pyarrow.parquet as pq
-
         # Check if the 'metadata' field is present and is a dict (or other struct-like type)
         if "metadata" in document and isinstance(document["metadata"], dict):
             document["metadata"] = json.dumps(document["metadata"])
@@ -228,6 +624,14 @@ class JSONParquetWriter(DiskWriter):
                 if self.schema is not None
                 else pa.RecordBatch.from_pylist([document]).schema,
                 compression=self.compression,
+                compression_level=self.compression_level,
+                use_dictionary=self.use_dictionary,
+                use_byte_stream_split=self.use_byte_stream_split,
+                column_encoding=self.column_encoding,
+                write_statistics=self.write_statistics,
+                data_page_size=self.data_page_size,
+                write_page_index=False,
+                store_schema=not self.intermediate,
             )
         self._batches[filename].append(document)
         if len(self._batches[filename]) == self.batch_size:
@@ -236,8 +640,13 @@ class JSONParquetWriter(DiskWriter):
     def close(self):
         for filename in list(self._batches.keys()):
             self._write_batch(filename)
+        for filename in list(self._row_groups.keys()):
+            self._write_row_group(filename)
         for writer in self._writers.values():
             writer.close()
         self._batches.clear()
+        self._row_groups.clear()
+        self._row_group_rows.clear()
+        self._row_group_bytes.clear()
         self._writers.clear()
         super().close()
@@ -2,14 +2,20 @@
 
 from pathlib import Path
 from typing import Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import yaml
 
+try:
+    # The libyaml bindings are a lot faster, but are not always available.
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 def load_yml_config(path: Path):
     """Classmethod returns YAML config"""
     try:
-        return yaml.safe_load(path.read_text())
+        return yaml.load(path.read_bytes(), Loader=SafeLoader)
 
     except FileNotFoundError as error:
         message = "Error: yml config file not found."
@@ -20,6 +26,8 @@ def load_yml_config(path: Path):
 class Dataset(BaseModel):
     """Dataset config object containing various info about a specific dataset."""
 
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(help="Name of the dataset to be processed")
     input_dir: str = Field(help="Path to the directory keeping the raw data")
     glob_pattern: str | None = Field(
@@ -42,9 +50,17 @@ class ExecutorConfig(BaseModel):
 class ClusterConfig(BaseModel):
     """Dask Cluster configurations."""
 
+    # Frozen so the config can key the client cache directly.
+    model_config = ConfigDict(frozen=True)
+
     type: Literal["local", "distributed"] = Field(
         "local", help="Whether to run the cluster locally or in a distributed setting."
     )  # distributed
+    protocol: Literal["tcp", "ucx"] = Field(
+        "tcp",
+        help="Communication protocol between scheduler and workers. "
+        "UCX requires `ucx-py` to be installed on all machines.",
+    )
     scheduler_host: str | None = Field("localhost", help="")
     scheduler_port: int | None = Field(8786, help="")
     scheduler_file: str | None = Field(
@@ -52,7 +68,9 @@ class ClusterConfig(BaseModel):
     )
     n_workers: int = Field(5, help="")
     worker_threads: int = Field(
-        3, help="Number of worker threads. I.e. number of parallel tasks per worker."
+        1,
+        help="Number of worker threads. I.e. number of parallel tasks per worker. "
+        "Also caps the threads used by native libraries (OpenMP, MKL, etc.) per worker.",
     )
 
 
@@ -17,6 +17,7 @@ from datatrove.pipeline.dedup import (
 from datatrove.utils.typeshelper import Languages
 from datatrove.utils.hashing import HashConfig
 
+from dfm_processing.data_pipeline.components.exact_dedup import ExactDedupFilter
 from dfm_processing.data_pipeline.components.writer import (
     JSONParquetWriter,
 )
@@ -49,9 +50,13 @@ def minhash_deduplication(
     input_reader = JSONParquetReader(data_dir, glob_pattern="**/*.parquet")
     # stage 1 computes minhash signatures for each task (each task gets a set of files)
     # you can also change ngrams or the number of buckets and their size here
+    # better precision -> fewer false positives (collisions). The shingles are
+    # hashed with xxhash, which is much faster than sha1 and only needs to spread
+    # them evenly, not be cryptographically secure.
     minhash_config = MinhashConfig(
-        num_buckets=n_buckets, hash_config=HashConfig(precision=64)
-    )  # better precision -> fewer false positives (collisions)
+        num_buckets=n_buckets,
+        hash_config=HashConfig(precision=64, hash_fc="xxhash"),
+    )
     stage1: list[PipelineStep] = [
         input_reader,
         MinhashDedupSignature(
@@ -121,8 +126,11 @@ def sentence_deduplication(
     )
 
     reader = JSONParquetReader(data_folder=data_dir, glob_pattern="**/*.parquet")
+    # Exact duplicates are dropped before the signatures are computed, and
+    # dropped again in the filter stage so both stages see the same documents.
     dedup_sigs: list[PipelineStep] = [
         reader,
+        ExactDedupFilter(),
         SentenceDedupSignature(
             output_folder=f"{dedup_dir}/sigs",
             config=config,
@@ -141,6 +149,9 @@ def sentence_deduplication(
 
     filter_dedup: list[PipelineStep] = [
         reader,
+        ExactDedupFilter(
+            exclusion_writer=JSONParquetWriter(f"{exclusion_dir}/exact_dedup/")
+        ),
         SentenceDedupFilter(
             data_folder=f"{dedup_dir}/dups",
             config=config,
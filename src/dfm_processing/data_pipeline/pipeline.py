@@ -2,24 +2,83 @@
 
 from datatrove.pipeline.base import PipelineStep
 from datatrove.pipeline.filters import (
-    LanguageFilter,
     GopherRepetitionFilter,
     C4QualityFilter,
     FineWebQualityFilter,
     GopherQualityFilter,
 )
 from datatrove.pipeline.readers import JsonlReader
-from datatrove.pipeline.formatters import FTFYFormatter
 from datatrove.pipeline.tokens import TokensCounter
 from datatrove.utils.typeshelper import Languages
 
 from datatrove.executor.local import LocalPipelineExecutor
+import threading
 import nltk
 
 from dfm_processing.data_pipeline.config import ExecutorConfig, Dataset
+from dfm_processing.data_pipeline.components.formatter import FastFTFYFormatter
+from dfm_processing.data_pipeline.components.fused_filter import FusedFilter
+from dfm_processing.data_pipeline.components.length_filter import LengthFilter
+from dfm_processing.data_pipeline.components.language_filter import (
+    TopLanguageFilter,
+)
 from dfm_processing.data_pipeline.components.writer import JSONParquetWriter
 
 
+_NLTK_LOCK = threading.Lock()
+_NLTK_READY = False
+_DANISH_STOPWORDS: frozenset[str] = frozenset()
+
+
+def _ensure_nltk() -> frozenset[str]:
+    """Download the NLTK resources used by the filters, once per process.
+
+    Returns:
+        The Danish stopwords.
+    """
+    global _NLTK_READY, _DANISH_STOPWORDS
+    if not _NLTK_READY:
+        with _NLTK_LOCK:
+            if not _NLTK_READY:
+                for resource in [
+                    "tokenizers/punkt_tab",
+                    "corpora/stopwords",
+                    "tokenizers/punkt",
+                ]:
+                    try:
+                        # Skip the download (and the index request it makes) for
+                        # resources already installed, e.g. in a container image.
+                        nltk.data.find(resource)
+                    except LookupError:
+                        nltk.download(resource.split("/")[-1], quiet=True)
+                _DANISH_STOPWORDS = frozenset(nltk.corpus.stopwords.words("danish"))
+                _NLTK_READY = True
+    return _DANISH_STOPWORDS
+
+
+# The filtered output is read again by the deduplication pipelines, so it is written in
+# large batches, each filling one row group of the writer's default size. Every filter
+# has its own exclusion writer, which all buffer a row group in memory at the same time.
+# Their output is rarely read, so they use smaller row groups to keep memory use down.
+OUTPUT_BATCH_SIZE = 8 * 1024
+EXCLUSION_ROW_GROUP_SIZE = 2 * 1024
+
+
+def _exclusion_writer(dataset: Dataset, name: str) -> JSONParquetWriter:
+    """Create the writer for the documents removed by a filter.
+
+    Args:
+        dataset: The dataset being filtered
+        name: Name of the folder to write the removed documents to
+
+    Returns:
+        A writer saving to the dataset's exclusion directory
+    """
+    return JSONParquetWriter(
+        f"{dataset.exclusion_dir}/{name}", row_group_size=EXCLUSION_ROW_GROUP_SIZE
+    )
+
+
 def filter_pipeline(dataset: Dataset) -> list[PipelineStep]:
     """Method for building up a set of filtering steps for a datatrove pipeline.
 
@@ -31,26 +90,33 @@ def filter_pipeline(dataset: Dataset) -> list[PipelineStep]:
     Returns:
         A list of pipeline steps to use in a datatrove pipeline
     """
-    nltk.download("punkt_tab", quiet=True)
-    nltk.download("stopwords", quiet=True)
-    nltk.download("punkt", quiet=True)
-    if any(
-        [
-            path == ""
-            for path in [dataset.input_dir, dataset.exclusion_dir, dataset.output_dir]
-        ]
-    ):
+    if not (dataset.input_dir and dataset.exclusion_dir and dataset.output_dir):
         raise ValueError("All input paths must have a value")
 
     if dataset.glob_pattern == "":
         raise ValueError("Glob pattern cannot be empty.")
 
+    stopwords = _ensure_nltk()
+
     reader = JsonlReader(
         data_folder=dataset.input_dir, glob_pattern=dataset.glob_pattern
     )
-    filter_steps = [
-        FTFYFormatter(),
-        LanguageFilter(
+    gopher_quality = GopherQualityFilter(
+        stop_words=stopwords,
+        language=Languages.danish,
+        exclusion_writer=_exclusion_writer(dataset, "gopher_quality"),
+    )
+    # The formatter and filters are cheap per document, so they run fused in a single
+    # step to save the per-step dispatch.
+    fused_steps = [
+        FastFTFYFormatter(),
+        # Every word has at least one character, so shorter documents are always
+        # dropped by the Gopher quality filter. Drop them before the costlier filters.
+        LengthFilter(
+            min_chars=gopher_quality.min_doc_words or 0,
+            exclusion_writer=_exclusion_writer(dataset, "length"),
+        ),
+        TopLanguageFilter(
             languages=[
                 Languages.danish,
                 # Languages.swedish,
@@ -58,37 +124,27 @@ def filter_pipeline(dataset: Dataset) -> list[PipelineStep]:
                 # Languages.norwegian_nynorsk,
                 # Languages.english,
             ],
-            exclusion_writer=JSONParquetWriter(
-                f"{dataset.exclusion_dir}/non_danish_documents"
-            ),
+            exclusion_writer=_exclusion_writer(dataset, "non_danish_documents"),
             label_only=False,
         ),
         GopherRepetitionFilter(
             language=Languages.danish,
-            exclusion_writer=JSONParquetWriter(
-                f"{dataset.exclusion_dir}/gopher_repetition"
-            ),
-        ),
-        GopherQualityFilter(
-            stop_words=nltk.corpus.stopwords.words("danish"),
-            language=Languages.danish,
-            exclusion_writer=JSONParquetWriter(
-                f"{dataset.exclusion_dir}/gopher_quality"
-            ),
+            exclusion_writer=_exclusion_writer(dataset, "gopher_repetition"),
         ),
+        gopher_quality,
         C4QualityFilter(
             language=Languages.danish,
-            exclusion_writer=JSONParquetWriter(f"{dataset.exclusion_dir}/c4_quality"),
+            exclusion_writer=_exclusion_writer(dataset, "c4_quality"),
         ),
         FineWebQualityFilter(
             language=Languages.danish,
-            exclusion_writer=JSONParquetWriter(
-                f"{dataset.exclusion_dir}/fineweb_quality"
-            ),
+            exclusion_writer=_exclusion_writer(dataset, "fineweb_quality"),
         ),
-        TokensCounter(),
     ]
-    writer = JSONParquetWriter(f"{dataset.output_dir}/filter_output")
+    filter_steps = [FusedFilter(fused_steps), TokensCounter()]
+    writer = JSONParquetWriter(
+        f"{dataset.output_dir}/filter_output", batch_size=OUTPUT_BATCH_SIZE
+    )
 
     return [reader] + filter_steps + [writer]
 
@@ -5,12 +5,16 @@ from datatrove.utils.logging import log_pipeline
 
 
 def print_pipeline(executor: LocalPipelineExecutor):
-    """Simple method that recursively prints the pipeline of a series of executors.
+    """Simple method that prints the pipelines of a series of executors, in the order
+    they run.
 
     Args:
         executor: The executor which pipeline to print
     """
-    if executor.depends:
-        print_pipeline(executor.depends)
+    chain: list[LocalPipelineExecutor] = []
+    while executor:
+        chain.append(executor)
+        executor = executor.depends
 
-    log_pipeline(executor.pipeline)
+    for dependency in reversed(chain):
+        log_pipeline(dependency.pipeline)
@@ -1,7 +1,13 @@
 """Module containing methods for the CLI regarding document processing."""
 
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import mmap
+import os
 from pathlib import Path
+import re
+import shutil
 import subprocess
 
 import typer
@@ -10,6 +16,89 @@ from .document_processing.processors import process_files
 
 app = typer.Typer()
 
+# The third whitespace separated column of crawl log lines starting with "--", which
+# holds the URL that was fetched.
+CRAWL_LOG_URL = re.compile(rb"^--\S*[^\S\n]+\S+[^\S\n]+(\S+)", re.MULTILINE)
+
+
+def _iter_files(root: Path) -> Iterator[Path]:
+    """Recursively yield the files with a suffix below `root`.
+
+    Like filtering `root.glob("**/*.*")` on `is_file()`, but uses the file type
+    cached by `os.scandir` instead of a `stat` call per path. Symlinks are skipped,
+    as they are by ripgrep in `_scan_files`.
+
+    Args:
+        root: Directory to walk.
+
+    Yields:
+        Paths of the files found.
+    """
+    directories = [root]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(Path(entry.path))
+                elif "." in entry.name and entry.is_file(follow_symlinks=False):
+                    yield Path(entry.path)
+
+
+def _scan_files(root: Path) -> list[Path]:
+    """List the files with a suffix below `root`.
+
+    Lets ripgrep walk the tree when it is installed, as its parallel walker is much
+    faster on trees with millions of files, and falls back to `_iter_files`
+    otherwise, or when ripgrep exits with an error or finds nothing.
+
+    Args:
+        root: Directory to walk.
+
+    Returns:
+        Paths of the files found.
+    """
+    rg = shutil.which("rg")
+    if rg is None:
+        return list(_iter_files(root))
+
+    try:
+        result = subprocess.run(
+            [rg, "--files", "--no-ignore", "--hidden", "--null", str(root)],
+            capture_output=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError:
+        # rg exits with 1 when there are no files, and with 2 on errors.
+        return list(_iter_files(root))
+    files = []
+    for raw_path in result.stdout.split(b"\0"):
+        if b"." in raw_path.rpartition(b"/")[2]:
+            files.append(Path(os.fsdecode(raw_path)))
+    return files
+
+
+def _crawled_folders(path_to_crawl_log: Path) -> set[str]:
+    """Find the top level folders, i.e. the hosts, of the URLs fetched in a crawl.
+
+    Args:
+        path_to_crawl_log: Path to a log file from the crawl
+
+    Returns:
+        The names of the folders the crawled data was saved to.
+    """
+    folders: set[str] = set()
+    with path_to_crawl_log.open("rb") as log_file:
+        # An empty file can't be memory mapped
+        if os.fstat(log_file.fileno()).st_size == 0:
+            return folders
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as log_data:
+            for match in CRAWL_LOG_URL.finditer(log_data):
+                parts = match.group(1).split(b"/")
+                if len(parts) >= 3:
+                    folders.add(parts[2].decode("utf-8", "replace"))
+    folders.discard("")
+    return folders
+
 
 @app.command(
     name="process-directory",
@@ -23,6 +112,7 @@ def crawl_directory(
     n_workers: int = 4,
     key_paths: str = "text",
     text_format: str = "txt",
+    cache_dir: Path | None = None,
 ):
     """Process a set of data delivered from a DSK organisation.
 
@@ -34,10 +124,9 @@ def crawl_directory(
         n_workers: How many process to run in parallel. Defaults to 4.
         key_paths: If JSON data, what is the path to the text (Can be nested keys represented as a comma separated list).
         text_format: What format is the text, html or plain text.
+        cache_dir: Directory to cache processed files in, so reruns skip unchanged files.
     """
-    files = list(top_level_path.glob("**/*.*"))
-
-    files = list(filter(lambda x: x.is_file(), files))
+    files = _scan_files(top_level_path)
 
     if len(files) == 0:
         logging.error("Something went wrong. No files to process")
@@ -51,6 +140,7 @@ def crawl_directory(
         n_workers,
         text_path=key_paths,
         text_format=text_format,
+        cache_dir=cache_dir,
     )
 
 
@@ -65,6 +155,7 @@ def process_web_crawl(
     dsk_client: str,
     output_suffix: str = ".jsonl.gz",
     n_workers: int = 4,
+    cache_dir: Path | None = None,
 ):
     """Process a set of crawled data from a DSK organisation.
 
@@ -75,34 +166,37 @@ def process_web_crawl(
         dsk_client: What DSK organizations pages have been crawled
         output_suffix: What suffix to use. Defaults to ".jsonl.gz".
         n_workers: How many process to run in parallel. Defaults to 4.
+        cache_dir: Directory to cache processed files in, so reruns skip unchanged files.
     """
-    # Define the command as a list of strings
-    command = ["grep", "^--", path_to_crawl_log]
-    # Run the command and capture the output
     try:
-        result = subprocess.run(command, text=True, capture_output=True, check=True)  # type: ignore
-        # Filter the third column using Python (equivalent to `awk '{print $3}'`)
-        main_folders = {
-            line.split()[2].split("/")[2]
-            if len(line.split()[2].split("/")) >= 3
-            else ""
-            for line in result.stdout.splitlines()
-        }
-        main_folders = set(filter(lambda x: x != "", main_folders))
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Command failed with error: {e}")
+        main_folders = _crawled_folders(path_to_crawl_log)
+    except OSError as e:
+        logging.error(f"Could not read the crawl log: {e}")
         raise typer.Exit(code=1)
 
-    files: list[Path] = []
-    for main_folder in main_folders:
-        if not (data_path / main_folder).exists():
-            continue
-        files.extend(list((data_path / main_folder).glob("**/*.*")))
+    def list_folder(main_folder: str) -> list[Path]:
+        if not (data_path / main_folder).is_dir():
+            return []
+        return _scan_files(data_path / main_folder)
 
-    files = list(filter(lambda x: x.is_file(), files))
+    # Directory listings mostly wait on the file system, so walk the folders of
+    # the different hosts concurrently.
+    with ThreadPoolExecutor(max_workers=min(32, len(main_folders) or 1)) as pool:
+        files = [
+            file
+            for folder_files in pool.map(list_folder, sorted(main_folders))
+            for file in folder_files
+        ]
 
     if len(files) == 0:
         logging.error("Something went wrong. No files to process")
         raise typer.Exit(code=1)
 
-    process_files(files, output_path, dsk_client, output_suffix, n_workers)
+    process_files(
+        files,
+        output_path,
+        dsk_client,
+        output_suffix,
+        n_workers,
+        cache_dir=cache_dir,
+    )
@@ -3,17 +3,22 @@
 import gzip
 import io
 import json
+import os
 import re
-from dataclasses import asdict
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import IO, TYPE_CHECKING, Any, Callable
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator
 
+import orjson
 from docling.datamodel.base_models import DocumentStream
 from docling.datamodel.document import TableItem, TextItem
+from docling.document_converter import DocumentConverter
 from extract_msg import openMsg
-from joblib import Parallel, delayed
+from joblib import Memory, Parallel, delayed
 from loguru import logger
-from pandas import Index
 from pypandoc import convert_file, convert_text
 from textract.parsers import process as process_doc
 from tqdm import tqdm
@@ -23,6 +28,8 @@ from .utils import (
     build_document_converter,
     build_metadata,
     create_JSONL,
+    dataframe_to_markdown,
+    dump_JSONL,
     find_near_duplicates,
     generate_decode_url,
     make_unique,
@@ -33,6 +40,28 @@ if TYPE_CHECKING:
     import pandas as pd
 
 SCRIPT_TAG = "<script></script>"
+# Runs of two or more newlines; replacing single newlines with themselves is a no-op.
+NEWLINES = re.compile(r"\n\n+")
+BRACKETS = re.compile(r"\[.+?\]")
+URL = re.compile(r"https?:\/\/[^>]+")
+OUTPUT_BUFFER_SIZE = 256 * 1024
+
+
+def format_plain_text(text: str) -> str:
+    return text
+
+
+def format_html_text(text: str) -> str:
+    # Trafilatura discards input with a single element as not being a full HTML
+    # document, the empty script tag makes sure a fragment has at least two.
+    return extract_html_text(text + SCRIPT_TAG)
+
+
+# Supported formatters for the text extracted from JSON files
+JSON_TEXT_FORMATTERS: dict[str, Callable[[str], str]] = {
+    "txt": format_plain_text,
+    "html": format_html_text,
+}
 
 
 def process_json(
@@ -55,82 +84,68 @@ def process_json(
 
     def extract_text(data: Any, keys: list[str]) -> list[str]:
         """
-        Recursively traverses the JSON structure to extract text at the given keys.
+        Traverses the JSON structure to extract text at the given keys.
+
+        Lists are searched element by element at any level. Uses an explicit stack
+        instead of recursion, visiting the values in document order.
 
         Args:
-            data (Any): The current level of the JSON object.
+            data (Any): The JSON object.
             keys (list[str]): List of keys to traverse.
 
         Returns:
             list[str]: A list of extracted text strings.
         """
-        if not keys:
-            # If keys are exhausted, handle the data
-            if isinstance(data, str):
-                return [data]
+        texts: list[str] = []
+        stack = [(data, 0)]
+        while stack:
+            data, depth = stack.pop()
             if isinstance(data, list):
-                # Collect strings from list elements
-                texts = []
-                for item in data:
-                    texts.extend(extract_text(item, keys))
-                return texts
-            if isinstance(data, dict):
-                return [json.dumps(data)]  # Convert objects to string representation
-
-            return [str(data)]  # Fallback for other data types
-
-        key = keys[0]
-        remaining_keys = keys[1:]
-
-        if isinstance(data, dict) and key in data:
-            return extract_text(data[key], remaining_keys)
-        if isinstance(data, list):
-            # If data is a list, attempt to extract text from each item
-            texts = []
-            for item in data:
-                texts.extend(extract_text(item, keys))
-            return texts
-
-        logger.warning(f"Key '{key}' not found in JSON document.")
-        return []
-
-    # Supported formatters (default options)
-    def default_formatter(text: str) -> str:
-        return text
+                stack.extend((item, depth) for item in reversed(data))
+            elif depth == len(keys):
+                # If keys are exhausted, handle the data
+                if isinstance(data, str):
+                    texts.append(data)
+                elif isinstance(data, dict):
+                    # Convert objects to string representation
+                    texts.append(json.dumps(data))
+                else:
+                    texts.append(str(data))  # Fallback for other data types
+            elif isinstance(data, dict) and keys[depth] in data:
+                stack.append((data[keys[depth]], depth + 1))
+            else:
+                logger.warning(f"Key '{keys[depth]}' not found in JSON document.")
+        return texts
 
     # Setup
     key_path: list[str] = kwargs.get("text_path", "text").split(",")  # type: ignore
     text_format: str = kwargs.get("text_format", "txt")
 
     # Choose the appropriate formatter
-    formatters = {
-        "txt": default_formatter,
-        "html": lambda text: extract_html_text(text + SCRIPT_TAG),
-    }
-    formatter: Callable[[str], str] = formatters.get(
+    formatter: Callable[[str], str] = JSON_TEXT_FORMATTERS.get(
         text_format,
-        default_formatter,
+        format_plain_text,
     )
 
-    if text_format not in formatters:
+    if text_format not in JSON_TEXT_FORMATTERS:
         logger.warning(
             f"Text format '{text_format}' is not supported. Defaulting to plain text.",
         )
 
     # Load and process the JSON file
     try:
-        with file_path.open("r", encoding="utf-8") as f:  # type: ignore
-            document = json.load(f)
+        raw = file_path.read_bytes()  # type: ignore
+        try:
+            document = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson is stricter, e.g. about NaN and integers beyond 64 bits.
+            document = json.loads(raw)
 
         extracted_texts = extract_text(document, key_path)
         extracted_texts = [formatter(text) for text in extracted_texts]
         metadata = build_metadata(file_path)
         formatted_texts = [
-            json.dumps(
-                asdict(create_JSONL(text, source, metadata)),
-                ensure_ascii=False,
-            )
-            for text in extracted_texts
+            dump_JSONL(create_JSONL(text, source, metadata)) for text in extracted_texts
         ]
         return formatted_texts
     except Exception as e:
@@ -162,12 +177,12 @@ def process_msg(
         return url
 
     text = openMsg(file_path).body
-    text = re.sub(r"(\n)+", "\n", text)
-    text = re.sub(r"\[.+?\]", "", text)
+    text = NEWLINES.sub("\n", text)
+    text = BRACKETS.sub("", text)
     text = text.replace("\r", "")
-    text = re.sub(r"https?:\/\/[^>]+", replace_url, text)
+    text = URL.sub(replace_url, text)
     metadata = build_metadata(file_path)
-    return json.dumps(asdict(create_JSONL(text, source, metadata)), ensure_ascii=False)
+    return dump_JSONL(create_JSONL(text, source, metadata))
 
 
 def process_html(
@@ -185,21 +200,17 @@ def process_html(
     Returns:
         str: JSONL line with the file content
     """
-    try:
-        file_content = (
-            file_path.read_text()
-            if isinstance(file_path, Path)
-            else file_path.read().decode()
-        )
-    except UnicodeDecodeError:
-        logger.error(f"Unable to read {file_path}")
-        return None
+    # Trafilatura detects the encoding of the raw bytes itself, so pages that are not
+    # UTF-8 encoded can be extracted as well, and the file isn't decoded twice.
+    file_content = (
+        file_path.read_bytes() if isinstance(file_path, Path) else file_path.read()
+    )
     text = extract_html_text(file_content)
     if not text:
         return None
-    text = re.sub(r"(\n)+", "\n", text)
+    text = NEWLINES.sub("\n", text)
     metadata = build_metadata(file_path)
-    return json.dumps(asdict(create_JSONL(text, source, metadata)), ensure_ascii=False)
+    return dump_JSONL(create_JSONL(text, source, metadata))
 
 
 def process_epub(
@@ -225,9 +236,9 @@ def process_epub(
         except UnicodeDecodeError:
             logger.error(f"Unable to read {file_path}")
             return None
-    text = re.sub(r"(\n)+", "\n", text)
+    text = NEWLINES.sub("\n", text)
     metadata = build_metadata(file_path)
-    return json.dumps(asdict(create_JSONL(text, source, metadata)), ensure_ascii=False)
+    return dump_JSONL(create_JSONL(text, source, metadata))
 
 
 def process_txt(
@@ -250,9 +261,9 @@ def process_txt(
         if isinstance(file_path, Path)
         else file_path.read().decode()
     )
-    text = re.sub(r"(\n)+", "\n", text)
+    text = NEWLINES.sub("\n", text)
     metadata = build_metadata(file_path)
-    return json.dumps(asdict(create_JSONL(text, source, metadata)), ensure_ascii=False)
+    return dump_JSONL(create_JSONL(text, source, metadata))
 
 
 def process_word_old(
@@ -272,9 +283,26 @@ def process_word_old(
     """
     file_bytes: bytes = process_doc(file_path)
     text: str = file_bytes.decode("utf-8")
-    text = re.sub(r"(\n)+", "\n", text)
+    text = NEWLINES.sub("\n", text)
     metadata = build_metadata(file_path)
-    return json.dumps(asdict(create_JSONL(text, source, metadata)), ensure_ascii=False)
+    return dump_JSONL(create_JSONL(text, source, metadata))
+
+
+# docling's DocumentConverter isn't documented as thread-safe, so each thread builds
+# its own on first use and reuses it for every later file.
+_THREAD_STATE = threading.local()
+
+
+def thread_document_converter() -> DocumentConverter:
+    """Get the document converter of the current thread, building it on first use.
+
+    Returns:
+        The docling `DocumentConverter` used by all calls in the thread.
+    """
+    converter = getattr(_THREAD_STATE, "converter", None)
+    if converter is None:
+        converter = _THREAD_STATE.converter = build_document_converter()
+    return converter
 
 
 def process_document(
@@ -293,7 +321,7 @@ def process_document(
     Returns:
         str | None: JSONL string if the file is processed successfully, else None.
     """
-    doc_converter = kwargs.get("converter", build_document_converter())
+    doc_converter = kwargs.get("converter") or thread_document_converter()
     try:
         input_ = (
             file_path
@@ -306,12 +334,12 @@ def process_document(
 
         metadata = build_metadata(result.input)
 
-        file_content = ""
+        parts: list[str] = []
         # Iterate the elements in reading order, including hierarchy level
         for item, _ in result.document.iterate_items():
             if isinstance(item, TextItem):
                 if item.text.strip():
-                    file_content += item.text
+                    parts.append(item.text)
             elif isinstance(item, TableItem):
                 table_df: pd.DataFrame = item.export_to_dataframe()
                 dups = find_near_duplicates(table_df, 0.8)
@@ -319,26 +347,39 @@ def process_document(
                 table_df.columns = [
                     make_unique(col, column_counts) for col in table_df.columns
                 ]
-                columns_to_keep: Index[str] = table_df.columns.copy(deep=True)  # type: ignore
-                for pair in dups:
-                    if pair[1] in columns_to_keep:
-                        columns_to_keep = columns_to_keep.drop(pair[1])
+                columns_to_drop = {pair[1] for pair in dups}
+                columns_to_keep = [
+                    col for col in table_df.columns if col not in columns_to_drop
+                ]
 
-                df_cleaned = table_df[list(columns_to_keep)]
+                df_cleaned = table_df[columns_to_keep]
                 df_cleaned = remove_newlines(df_cleaned)
-                file_content += df_cleaned.to_markdown(index=False, tablefmt="github")
-            file_content += "\n\n"
+                parts.append(dataframe_to_markdown(df_cleaned))
+            parts.append("\n\n")
+        file_content = "".join(parts)
 
         # Create and return JSONL entry
-        return json.dumps(
-            asdict(create_JSONL(file_content, source, metadata)),
-            ensure_ascii=False,
-        )
+        return dump_JSONL(create_JSONL(file_content, source, metadata))
     except Exception as e:
         logger.error(f"Failed to process file {file_path}: {e}")
         return None
 
 
+# The processing method to use for each supported file suffix
+PROCESSORS_BY_SUFFIX: dict[str, Callable[..., str | list[str] | None]] = {
+    ".pdf": process_document,
+    ".html": process_html,
+    ".docx": process_document,
+    ".epub": process_epub,
+    ".txt": process_txt,
+    ".pptx": process_document,
+    ".md": process_txt,
+    ".msg": process_msg,
+    ".json": process_json,
+    ".doc": process_word_old,
+}
+
+
 def process_file(
     file_path: Path | IO[bytes], source: str, **kwargs: dict
 ) -> str | list[str] | None:
@@ -352,23 +393,8 @@ def process_file(
     Returns:
         str | None: Returns a JSONL line if the file type is supported, else None.
     """
-    suffix = (
-        file_path.suffix
-        if isinstance(file_path, Path)
-        else "." + file_path.name.split(".")[-1]
-    )
-    method = {
-        ".pdf": process_document,
-        ".html": process_html,
-        ".docx": process_document,
-        ".epub": process_epub,
-        ".txt": process_txt,
-        ".pptx": process_document,
-        ".md": process_txt,
-        ".msg": process_msg,
-        ".json": process_json,
-        ".doc": process_word_old,
-    }.get(suffix)
+    suffix = os.path.splitext(file_path.name)[1].lower()
+    method = PROCESSORS_BY_SUFFIX.get(suffix)
 
     if not method:
         logger.warning(f"Unsupported file type: {suffix} - for file: {file_path!s}")
@@ -377,35 +403,134 @@ def process_file(
     return method(file_path, source, **kwargs)
 
 
+@contextmanager
+def open_gzip_writer(
+    path: Path, threads: int = 1, compresslevel: int = 9
+) -> Iterator[IO[bytes]]:
+    """Open a gzip file for writing.
+
+    Compresses with pigz on `threads` threads when it is installed, so compression
+    keeps up with several workers producing the data. Otherwise uses the gzip
+    module behind a large write buffer, as it deflates on every write.
+
+    Args:
+        path: The file to write
+        threads: Number of compression threads. Defaults to 1.
+        compresslevel: The gzip compression level, from 1 to 9. Defaults to 9.
+
+    Yields:
+        A binary file object to write the uncompressed data to.
+
+    Raises:
+        OSError: If pigz fails.
+    """
+    pigz = shutil.which("pigz")
+    if pigz is None or threads <= 1:
+        with (
+            gzip.open(path, mode="wb", compresslevel=compresslevel) as gzip_file,
+            io.BufferedWriter(gzip_file, buffer_size=OUTPUT_BUFFER_SIZE) as out_file,
+        ):
+            yield out_file
+        return
+
+    with path.open("wb") as raw_file:
+        process = subprocess.Popen(
+            [pigz, f"-{compresslevel}", "-p", str(threads)],
+            stdin=subprocess.PIPE,
+            stdout=raw_file,
+            bufsize=OUTPUT_BUFFER_SIZE,
+        )
+        stdin = process.stdin
+        assert stdin is not None  # opened with stdin=PIPE
+        try:
+            yield stdin
+        finally:
+            stdin.close()
+            returncode = process.wait()
+    if returncode != 0:
+        raise OSError(f"pigz failed with exit code {returncode} writing {path}")
+
+
+# Bump when a change to the processors changes their output, to invalidate the caches
+# of `process_files`.
+CACHE_VERSION = 1
+
+
+def _file_stamp(file_path: Path) -> tuple[int, int]:
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _process_file_cached(
+    file_path: Path,
+    source: str,
+    file_stamp: tuple[int, int],
+    cache_version: int,
+    converter: DocumentConverter | None = None,
+    **kwargs,
+) -> str | list[str] | None:
+    """`process_file` with the file's stamp and the cache version in the cache key."""
+    if converter is not None:
+        kwargs["converter"] = converter
+    return process_file(file_path, source, **kwargs)
+
+
 def process_files(
     files: list[Path],
     output_path: Path,
     dsk_client: str,
     output_suffix: str = ".jsonl.gz",
     n_workers: int = 4,
+    backend: str = "threading",
+    cache_dir: Path | None = None,
     **kwargs,
 ):
+    """Process a list of files in parallel and write them to a gzipped JSONL file.
+
+    Args:
+        files: The files to process
+        output_path: Where to write the output, either a `.jsonl.gz` file or a directory
+        dsk_client: What DSK client have delivered the files
+        output_suffix: Suffix of the output file when `output_path` is a directory.
+            Defaults to ".jsonl.gz".
+        n_workers: Number of files to process in parallel. Defaults to 4.
+        backend: The joblib backend to use. Each worker thread builds its document
+            converter once, and most of the work happens in pandoc, textract and
+            docling, outside of the GIL. Use "loky" for processes when the work is
+            mostly Python bound. Defaults to "threading".
+        cache_dir: Directory to cache the processed files in. When rerun, files whose
+            size and modification time are unchanged are taken from the cache
+            instead of being processed again. Defaults to None for no caching.
+        **kwargs: Extra arguments passed on to `process_file`
+    """
     save_file = output_path
     if "".join(output_path.suffixes) != ".jsonl.gz":
         save_file = output_path / (dsk_client + output_suffix)
 
-    converter = build_document_converter()
-    parallel = Parallel(n_jobs=n_workers, return_as="generator_unordered")
-    save_file.parent.mkdir(parents=True, exist_ok=True)
-    with gzip.open(save_file, mode="wb") as out_file:
-        # with (output_path / output_name).open("w+") as out_file:
-        for doc in parallel(
-            delayed(process_file)(
-                file,
-                dsk_client,
-                converter=converter,
-                **kwargs,
+    if cache_dir is None:
+        tasks = (
+            delayed(process_file)(file, dsk_client, **kwargs) for file in tqdm(files)
+        )
+    else:
+        cached_process_file = Memory(cache_dir, verbose=0).cache(
+            _process_file_cached, ignore=["converter"]
+        )
+        tasks = (
+            delayed(cached_process_file)(
+                file, dsk_client, _file_stamp(file), CACHE_VERSION, **kwargs
             )
             for file in tqdm(files)
-        ):
+        )
+
+    parallel = Parallel(
+        n_jobs=n_workers, backend=backend, return_as="generator_unordered"
+    )
+    save_file.parent.mkdir(parents=True, exist_ok=True)
+    with open_gzip_writer(save_file, threads=n_workers) as out_file:
+        for doc in parallel(tasks):
             if doc is None:
                 continue
             if isinstance(doc, str):
                 out_file.write(f"{doc}\n".encode())
             if isinstance(doc, list):
-                [out_file.write(f"{d}\n".encode()) for d in doc]
+                out_file.write("".join(f"{d}\n" for d in doc).encode())
@@ -7,6 +7,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import IO, Any, Callable, Union
 
+import numpy as np
+import orjson
 import pandas as pd
 from docling.backend.pypdfium2_backend import PyPdfiumDocumentBackend
 from docling.datamodel.base_models import InputFormat
@@ -95,6 +97,20 @@ def create_JSONL(text: str, source: str, metadata: dict[str, Any]) -> JSONL:
     return jsonl
 
 
+def dump_JSONL(jsonl: JSONL) -> str:
+    """Serialize a JSONL dataclass instance to a JSON line.
+
+    orjson serializes the dataclass directly, so it isn't converted to a dict first.
+
+    Args:
+        jsonl: The JSONL dataclass instance.
+
+    Returns:
+        str: The JSON line, without a trailing newline.
+    """
+    return orjson.dumps(jsonl, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def build_metadata(document: Union[InputDocument, Path, IO[bytes]]) -> dict:
     """Helper function to build metadata from an input file.
 
@@ -151,11 +167,22 @@ def find_near_duplicates(
       A list of tuples, where each tuple contains the names of two near-duplicate columns.
     """
 
-    near_duplicates = []
-    for i in range(len(df.columns)):
-        for j in range(i + 1, len(df.columns)):
-            if (df.iloc[:, i] == df.iloc[:, j]).mean() >= threshold:
-                near_duplicates.append((df.columns[i], df.columns[j]))
+    near_duplicates: list[tuple] = []
+    if len(df) == 0:
+        return near_duplicates
+
+    # Compare each column with all the columns after it at once. Missing values never
+    # count as identical, like when comparing the columns as Series.
+    values = df.to_numpy(dtype=object, na_value=None)
+    present = df.notna().to_numpy()
+    for i in range(len(df.columns) - 1):
+        identical = (
+            (values[:, i + 1 :] == values[:, i : i + 1])
+            & present[:, i + 1 :]
+            & present[:, i : i + 1]
+        )
+        for j in np.flatnonzero(identical.mean(axis=0) >= threshold):
+            near_duplicates.append((df.columns[i], df.columns[i + 1 + j]))
     return near_duplicates
 
 
@@ -178,6 +205,47 @@ def remove_newlines(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def dataframe_to_markdown(df: pd.DataFrame) -> str:
+    """Render a DataFrame as a GitHub markdown table.
+
+    Unlike `DataFrame.to_markdown`, the columns are not padded to a common width,
+    which saves tabulate's per-cell width computations on large tables, and keeps
+    the text free of alignment whitespace. The output also differs from tabulate's
+    in that strings are kept as written instead of being parsed as numbers (so
+    "007" stays "007"), and the separator row carries no alignment markers. As in
+    tabulate, None renders as an empty cell and NaN as "nan". Falls back to
+    `to_markdown` when a cell contains a `|` or a newline.
+
+    Args:
+        df: The DataFrame to render.
+
+    Returns:
+        The markdown table, without a trailing newline.
+    """
+
+    def format_cell(value: Any) -> str:
+        if value is None:
+            return ""
+        return format(value, "g") if isinstance(value, float) else str(value)
+
+    header = [str(col) for col in df.columns]
+    rows = [
+        [format_cell(value) for value in row]
+        for row in df.itertuples(index=False, name=None)
+    ]
+    if not header or any(
+        "|" in cell or "\n" in cell for row in [header, *rows] for cell in row
+    ):
+        return df.to_markdown(index=False, tablefmt="github")
+
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "|" + "|".join(["---"] * len(header)) + "|",
+    ]
+    lines.extend("| " + " | ".join(row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
 # Function to rename columns with unique suffixes
 def make_unique(column_name: str, column_counts: dict[str, int]) -> str:
     """Method to rename duplicate column name
@@ -13,7 +13,7 @@ from dfm_processing.data_pipeline.config import MinHashDeduplication
 
 from .data_pipeline.pipeline import filter_pipeline, build_executor
 from .data_pipeline.deduplication import sentence_deduplication, minhash_deduplication
-from .data_pipeline.cluster import create_client, submit_job
+from .data_pipeline.cluster import create_client, submit_job, submit_jobs
 from .data_pipeline.config import (
     PipelineConfig,
     load_yml_config,
@@ -65,9 +65,8 @@ def filter_pipe(
 
     cluster_config: ClusterConfig = config.cluster
     client: Client = create_client(cluster_config)
-    futures: list[Future] = []
-    for executor in executors:
-        futures.append(submit_job(client, executor.run))
+    # One scheduler call for all datasets instead of a submit per executor.
+    futures: list[Future] = submit_jobs(client, LocalPipelineExecutor.run, executors)
 
     stats: list[PipelineStats] = client.gather(futures)
     # merged stats
@@ -113,13 +112,14 @@ def sent_dedup(config_file: Path):
     )
 
     # Step 2
+    # Each of the n_tasks finder tasks matches the signatures of its own hash range,
+    # so they run in parallel on all workers.
     executor = build_executor(
         find_dedups,
         logging_dir=f"{dedup_config.logging_dir}/find_dedups",
         config=executor_config,
         depends=executor,
     )
-    executor.workers = 1  # NOTE: Not a pretty way of doing this.
 
     # Step 3
     executor = build_executor(
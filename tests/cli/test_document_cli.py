@@ -1,15 +1,15 @@
 """This module contains tests for the CLI methods pertaining to document processing."""
 
+import shutil
 import subprocess
 from pathlib import Path
-from subprocess import CalledProcessError, CompletedProcess
 
 import pytest
 from typer.testing import CliRunner
 
 # Import the Typer app from your CLI module.
 # Adjust the import path if necessary.
-from dfm_processing.document_cli import app
+from dfm_processing.document_cli import _crawled_folders, _scan_files, app
 
 # A global list to capture calls to process_files.
 process_files_calls = []
@@ -168,14 +168,6 @@ def test_process_web_crawl_valid(tmp_path, monkeypatch):
     file_in_subfolder = subfolder / "test.txt"
     file_in_subfolder.write_text("dummy file")
 
-    # Monkeypatch subprocess.run to return a dummy CompletedProcess.
-    def dummy_run(command, text, capture_output, check):
-        return CompletedProcess(
-            args=command, returncode=0, stdout="-- some /dummy/data\n"
-        )
-
-    monkeypatch.setattr(subprocess, "run", dummy_run)
-
     # Replace process_files with our dummy.
     monkeypatch.setattr(
         "dfm_processing.document_cli.process_files",
@@ -210,9 +202,9 @@ def test_process_web_crawl_valid(tmp_path, monkeypatch):
     assert call["n_workers"] == 4
 
 
-def test_process_web_crawl_subprocess_fail(tmp_path, monkeypatch):
+def test_process_web_crawl_no_crawled_urls(tmp_path, monkeypatch):
     """
-    Test the 'process-web-crawl' command when the grep subprocess fails.
+    Test the 'process-web-crawl' command when the crawl log has no fetched URLs.
     In this case, the command should exit with code 1.
     """
     crawl_log = tmp_path / "crawl.log"
@@ -223,12 +215,6 @@ def test_process_web_crawl_subprocess_fail(tmp_path, monkeypatch):
     data_dir = tmp_path / "data"
     data_dir.mkdir()
 
-    # Monkeypatch subprocess.run to simulate failure.
-    def dummy_run_fail(command, text, capture_output, check):
-        raise CalledProcessError(returncode=1, cmd=command)
-
-    monkeypatch.setattr(subprocess, "run", dummy_run_fail)
-
     result = runner.invoke(
         app,
         [
@@ -243,6 +229,36 @@ def test_process_web_crawl_subprocess_fail(tmp_path, monkeypatch):
     assert result.exit_code == 1
 
 
+def test_process_web_crawl_missing_log(tmp_path):
+    result = runner.invoke(
+        app,
+        [
+            "process-web-crawl",
+            str(tmp_path / "missing.log"),
+            str(tmp_path / "output"),
+            str(tmp_path / "data"),
+            "dummy_client",
+        ],
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 1
+
+
+def test_crawled_folders(tmp_path):
+    crawl_log = tmp_path / "crawl.log"
+    crawl_log.write_text(
+        "--2024-01-01 12:00:00--  https://www.example.dk/side.html\n"
+        "Resolving www.example.dk... 127.0.0.1\n"
+        "--2024-01-01 12:00:01--  https://cdn.example.dk/image.png\n"
+        "--2024-01-01 12:00:02--  not-a-url\n"
+        "--2024-01-01\n"
+    )
+    assert _crawled_folders(crawl_log) == {"www.example.dk", "cdn.example.dk"}
+
+    crawl_log.write_text("")
+    assert _crawled_folders(crawl_log) == set()
+
+
 def test_process_web_crawl_no_files(tmp_path, monkeypatch):
     """
     Test the 'process-web-crawl' command when the grep output indicates a valid folder,
@@ -258,13 +274,6 @@ def test_process_web_crawl_no_files(tmp_path, monkeypatch):
     data_dir.mkdir()
     # Do NOT create the subfolder "data" inside data_dir, so no files will be found.
 
-    # Monkeypatch subprocess.run to return valid grep output.
-    def dummy_run(command, text, capture_output, check):
-        return CompletedProcess(
-            args=command, returncode=0, stdout="-- some /dummy/data\n"
-        )
-
-    monkeypatch.setattr(subprocess, "run", dummy_run)
     # Replace process_files even though it should not be called.
     monkeypatch.setattr(
         "dfm_processing.document_cli.process_files",
@@ -285,3 +294,114 @@ def test_process_web_crawl_no_files(tmp_path, monkeypatch):
 
     # Because no files are found in the expected folder, the command should exit with code 1.
     assert result.exit_code == 1
+
+
+def test_crawl_directory_nested_files(tmp_path, monkeypatch):
+    """Files are found in nested directories, and names without a suffix skipped."""
+    input_dir = tmp_path / "input"
+    (input_dir / "a" / "b").mkdir(parents=True)
+    nested_file = input_dir / "a" / "b" / "nested.html"
+    nested_file.write_text("dummy content")
+    top_file = input_dir / "top.txt"
+    top_file.write_text("dummy content")
+    (input_dir / "a" / "no_suffix").write_text("dummy content")
+    (input_dir / "a" / "folder.d").mkdir()
+
+    monkeypatch.setattr(
+        "dfm_processing.document_cli.process_files",
+        dummy_process_files,
+    )
+
+    result = runner.invoke(
+        app,
+        ["process-directory", str(input_dir), str(tmp_path / "output"), "dummy"],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert sorted(process_files_calls[0]["files"]) == sorted([nested_file, top_file])
+
+
+def test_process_web_crawl_multiple_hosts(tmp_path, monkeypatch):
+    """Files of every crawled host folder are collected."""
+    crawl_log = tmp_path / "crawl.log"
+    crawl_log.write_text(
+        "--2024-01-01 12:00:00--  https://a.dk/index.html\n"
+        "--2024-01-01 12:00:01--  https://b.dk/index.html\n"
+        "--2024-01-01 12:00:02--  https://missing.dk/index.html\n"
+    )
+    data_dir = tmp_path / "data"
+    expected = []
+    for host in ["a.dk", "b.dk"]:
+        (data_dir / host / "sub").mkdir(parents=True)
+        for name in ["index.html", "sub/page.html"]:
+            (data_dir / host / name).write_text("dummy file")
+            expected.append(data_dir / host / name)
+
+    monkeypatch.setattr(
+        "dfm_processing.document_cli.process_files",
+        dummy_process_files,
+    )
+
+    result = runner.invoke(
+        app,
+        [
+            "process-web-crawl",
+            str(crawl_log),
+            str(tmp_path / "output"),
+            str(data_dir),
+            "dummy_client",
+        ],
+        catch_exceptions=False,
+    )
+
+    assert result.exit_code == 0
+    assert sorted(process_files_calls[0]["files"]) == sorted(expected)
+
+
+def test_scan_files_with_ripgrep(tmp_path, monkeypatch):
+    """The files listed by ripgrep are used, skipping names without a suffix."""
+    calls = []
+
+    def run(args, **kwargs):
+        calls.append(args)
+        return subprocess.CompletedProcess(args, 0, b"/data/a.dk/x.html\0/data/a.d/y\0")
+
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/rg")
+    monkeypatch.setattr("subprocess.run", run)
+
+    assert _scan_files(tmp_path) == [Path("/data/a.dk/x.html")]
+    assert "--follow" not in calls[0]
+
+
+@pytest.mark.parametrize("use_ripgrep", [True, False])
+def test_scan_files_skips_symlinks(tmp_path, monkeypatch, use_ripgrep):
+    """ripgrep and the Python walk both skip symlinked files and directories."""
+    if use_ripgrep and shutil.which("rg") is None:
+        pytest.skip("ripgrep is not installed")
+    if not use_ripgrep:
+        monkeypatch.setattr("shutil.which", lambda _: None)
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "linked.txt").write_text("dummy content")
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "file.txt").write_text("dummy content")
+    (root / "link.txt").symlink_to(other / "linked.txt")
+    (root / "dir_link").symlink_to(other)
+
+    assert _scan_files(root) == [root / "file.txt"]
+
+
+@pytest.mark.parametrize("returncode", [1, 2])
+def test_scan_files_ripgrep_error(tmp_path, monkeypatch, returncode):
+    """The tree is walked in Python when ripgrep finds nothing or fails."""
+    (tmp_path / "file.txt").write_text("dummy content")
+
+    def run(args, **kwargs):
+        raise subprocess.CalledProcessError(returncode, args)
+
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/rg")
+    monkeypatch.setattr("subprocess.run", run)
+
+    assert _scan_files(tmp_path) == [tmp_path / "file.txt"]
@@ -104,7 +104,7 @@ def test_cli_filter_valid(monkeypatch, tmp_path, dummy_client, dummy_future):
     We monkeypatch:
       - load_yml_config: returns our dummy_config_valid.
       - create_client: returns a dummy client.
-      - submit_job: always returns a dummy future.
+      - submit_jobs: returns a dummy future per executor.
       - print_pipeline: replaced with a no-op.
       - logger.success: captured to verify that output is generated.
     """
@@ -121,8 +121,12 @@ def test_cli_filter_valid(monkeypatch, tmp_path, dummy_client, dummy_future):
     # Patch create_client to return our dummy client.
     monkeypatch.setattr(cli_mod, "create_client", lambda cfg: dummy_client)
 
-    # Patch submit_job so that it returns our dummy future.
-    monkeypatch.setattr(cli_mod, "submit_job", lambda client, fn: dummy_future)
+    # Patch submit_jobs so that it returns a dummy future per executor.
+    monkeypatch.setattr(
+        cli_mod,
+        "submit_jobs",
+        lambda client, fn, executors: [dummy_future for _ in executors],
+    )
 
     # Patch print_pipeline to be a no-op.
     monkeypatch.setattr(cli_mod, "print_pipeline", lambda executor: None)
@@ -1,24 +1,33 @@
 import pytest
-from unittest.mock import create_autospec
+from unittest.mock import MagicMock, create_autospec
 from dask.distributed import Client
 from distributed import Future
 
 from dfm_processing.data_pipeline.config import ClusterConfig
 from dfm_processing.data_pipeline.cluster import (
+    _CLIENT_CACHE,
     create_client,
+    fire_and_forget_job,
     submit_job,
+    submit_jobs,
 )
 
 
 @pytest.fixture
 def mock_client(mocker):
     """Fixture providing a mock Dask Client"""
-    mock = create_autospec(Client)
+    # A plain spec is much cheaper to build than create_autospec(Client), which
+    # inspects the signature of every Client method.
+    mock = MagicMock(spec=Client)
+    mock.return_value = MagicMock(spec=Client)
     mocker.patch("dfm_processing.data_pipeline.cluster.Client", new=mock)
-    return mock
+    mocker.patch("dfm_processing.data_pipeline.cluster.atexit")
+    _CLIENT_CACHE.clear()
+    yield mock
+    _CLIENT_CACHE.clear()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cluster_config():
     """Fixture providing base cluster configuration"""
     return ClusterConfig(
@@ -52,6 +61,16 @@ def cluster_config():
             {},  # using ClusterConfig() defaults; assume default type is "distributed",
             {"branch": "local", "address": "localhost:8786", "n_workers": 5},
         ),
+        # Test case 4: Distributed without scheduler_file: address includes the protocol
+        (
+            {"type": "distributed"},
+            {"branch": "distributed", "address": "tcp://localhost:8786"},
+        ),
+        # Test case 5: Distributed over UCX
+        (
+            {"type": "distributed", "protocol": "ucx"},
+            {"branch": "distributed", "address": "ucx://localhost:8786"},
+        ),
     ],
 )
 def test_create_client_parametrized(mock_client, config_kwargs, expected):
@@ -99,6 +118,17 @@ def test_create_client_parametrized(mock_client, config_kwargs, expected):
     assert isinstance(client, Client)
 
 
+def test_create_client_cached(mock_client):
+    config = ClusterConfig(type="distributed", scheduler_file="/path/to/scheduler.json")
+    mock_client.return_value.status = "running"
+
+    client = create_client(config)
+    same_client = create_client(config)
+
+    assert client is same_client
+    mock_client.assert_called_once_with(scheduler_file="/path/to/scheduler.json")
+
+
 # Tests for submit_job
 def test_submit_job_with_arguments(mock_client):
     mock_future = create_autospec(Future)
@@ -110,7 +140,9 @@ def test_submit_job_with_arguments(mock_client):
     future = submit_job(mock_client, test_job, 1, 2, 3)
 
     # Verify submission parameters
-    mock_client.submit.assert_called_once_with(test_job, 1, 2, 3)
+    mock_client.submit.assert_called_once_with(
+        test_job, 1, 2, 3, key=None, pure=False, retries=None
+    )
     assert future == mock_future
     assert isinstance(future, Future)
 
@@ -124,7 +156,9 @@ def test_submit_job_no_arguments(mock_client):
 
     future = submit_job(mock_client, test_job)
 
-    mock_client.submit.assert_called_once_with(test_job)
+    mock_client.submit.assert_called_once_with(
+        test_job, key=None, pure=False, retries=None
+    )
     assert future == mock_future
 
 
@@ -135,9 +169,41 @@ def test_submit_job_with_keyword_arguments(mock_client):
     def test_job(a, b=0):
         return a + b
 
-    # Note: The current implementation doesn't support kwargs, so they should fail
-    with pytest.raises(TypeError):
-        submit_job(mock_client, test_job, 1, b=2)  # type: ignore
+    future = submit_job(mock_client, test_job, 1, b=2)
+
+    mock_client.submit.assert_called_once_with(
+        test_job, 1, b=2, key=None, pure=False, retries=None
+    )
+    assert future == mock_future
+
+
+def test_submit_job_with_key(mock_client):
+    submit_job(mock_client, print, "test", key="job-0", pure=True)
+
+    mock_client.submit.assert_called_once_with(
+        print, "test", key="job-0", pure=True, retries=None
+    )
+
+
+def test_submit_job_with_retries(mock_client):
+    submit_job(mock_client, print, "test", retries=3)
+
+    mock_client.submit.assert_called_once_with(
+        print, "test", key=None, pure=False, retries=3
+    )
+
+
+def test_fire_and_forget_job(mock_client, mocker):
+    mock_future = create_autospec(Future)
+    mock_client.submit.return_value = mock_future
+    fire_and_forget = mocker.patch("distributed.fire_and_forget")
+
+    fire_and_forget_job(mock_client, print, "test", retries=3)
+
+    mock_client.submit.assert_called_once_with(
+        print, "test", key=None, pure=False, retries=3
+    )
+    fire_and_forget.assert_called_once_with(mock_future)
 
 
 def test_submit_job_error_handling(mock_client):
@@ -147,6 +213,38 @@ def test_submit_job_error_handling(mock_client):
         submit_job(mock_client, print, "test")
 
 
+def test_submit_jobs(mock_client):
+    mock_futures = [create_autospec(Future) for _ in range(3)]
+    mock_client.map.return_value = mock_futures
+
+    def test_job(a, b):
+        return a + b
+
+    futures = submit_jobs(mock_client, test_job, [1, 2, 3], [4, 5, 6], batch_size=2)
+
+    mock_client.map.assert_called_once_with(
+        test_job, [1, 2, 3], [4, 5, 6], batch_size=2, pure=False
+    )
+    mock_client.scatter.assert_not_called()
+    assert futures == mock_futures
+
+
+def test_submit_jobs_scatters_shared_arguments(mock_client):
+    shared_future = create_autospec(Future)
+    mock_client.scatter.return_value = [shared_future]
+
+    def test_job(a, table):
+        return table[a]
+
+    table = {i: i for i in range(100)}
+    submit_jobs(mock_client, test_job, [1, 2], table=table)
+
+    mock_client.scatter.assert_called_once_with([table], broadcast=True)
+    mock_client.map.assert_called_once_with(
+        test_job, [1, 2], batch_size=64, pure=False, table=shared_future
+    )
+
+
 # Edge case tests
 def test_submit_non_callable(mock_client):
     # Configure the mock to simulate Dask's behavior
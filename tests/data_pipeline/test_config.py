@@ -52,6 +52,11 @@ VALID_PIPELINE = {
     "cluster": VALID_CLUSTER,
 }
 
+# Dumped once and shared by the YAML tests.
+VALID_PIPELINE_YAML = yaml.dump(
+    VALID_PIPELINE, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+)
+
 
 # Tests for Dataset model
 def test_dataset_valid():
@@ -98,6 +103,7 @@ def test_cluster_defaults():
     cluster = ClusterConfig()
     assert cluster.type == "local"
     assert cluster.n_workers == 5
+    assert cluster.worker_threads == 1
 
 
 @pytest.mark.parametrize("cluster_type", ["local", "distributed", None])
@@ -119,6 +125,13 @@ def test_cluster_port_type():
         ClusterConfig(scheduler_port="not_an_integer")
 
 
+def test_cluster_frozen():
+    cluster = ClusterConfig()
+    assert hash(cluster) == hash(ClusterConfig())
+    with pytest.raises(ValidationError):
+        cluster.n_workers = 2
+
+
 # Tests for PipelineConfig model
 def test_pipeline_valid():
     pipeline = PipelineConfig(**VALID_PIPELINE)
@@ -128,19 +141,21 @@ def test_pipeline_valid():
     assert isinstance(pipeline.sentence_deduplication, SentenceDeduplication)
 
 
-def test_pipeline_missing_required_fields():
-    required_fields = [
+@pytest.mark.parametrize(
+    "missing_field",
+    [
         "datasets",
         "executor",
         "sentence_deduplication",
         "minhash_deduplication",
         "cluster",
-    ]
-    for field in required_fields:
-        data = VALID_PIPELINE.copy()
-        del data[field]
-        with pytest.raises(ValidationError):
-            PipelineConfig(**data)
+    ],
+)
+def test_pipeline_missing_required_fields(missing_field):
+    data = VALID_PIPELINE.copy()
+    del data[missing_field]
+    with pytest.raises(ValidationError):
+        PipelineConfig(**data)
 
 
 def test_pipeline_invalid_nested_model():
@@ -153,7 +168,7 @@ def test_pipeline_invalid_nested_model():
 # Tests for YAML loading and integration
 def test_load_yml_config_valid(tmp_path):
     config_file = tmp_path / "config.yml"
-    config_file.write_text(yaml.dump(VALID_PIPELINE))
+    config_file.write_text(VALID_PIPELINE_YAML)
     data = load_yml_config(config_file)
     assert isinstance(data, dict)
     assert "datasets" in data
@@ -166,7 +181,7 @@ def test_load_yml_config_missing_file():
 
 def test_pipeline_from_yml(tmp_path):
     config_file = tmp_path / "config.yml"
-    config_file.write_text(yaml.dump(VALID_PIPELINE))
+    config_file.write_text(VALID_PIPELINE_YAML)
     data = load_yml_config(config_file)
     pipeline = PipelineConfig(**data)
     assert pipeline.datasets[0].name == "test"
@@ -0,0 +1,24 @@
+"""Tests for the exact deduplication filter."""
+
+from datatrove.data import Document
+
+from dfm_processing.data_pipeline.components.exact_dedup import ExactDedupFilter
+
+
+def test_exact_dedup_filter():
+    texts = ["a", "b", "a", "c", "b"]
+    documents = [Document(text=text, id=str(i)) for i, text in enumerate(texts)]
+    exact_filter = ExactDedupFilter()
+
+    kept = [document.id for document in exact_filter.run(documents)]
+    assert kept == ["0", "1", "3"]
+    assert exact_filter.stats["dropped_exact_duplicate"].total == 2
+
+
+def test_exact_dedup_filter_is_repeatable():
+    documents = [Document(text="a", id="0"), Document(text="a", id="1")]
+    exact_filter = ExactDedupFilter()
+
+    # A second run over the same input drops the same documents.
+    for _ in range(2):
+        assert [document.id for document in exact_filter.run(documents)] == ["0"]
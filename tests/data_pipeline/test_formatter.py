@@ -0,0 +1,24 @@
+"""Tests for the custom datatrove formatters."""
+
+import pytest
+from datatrove.pipeline.formatters import FTFYFormatter
+
+from dfm_processing.data_pipeline.components.formatter import FastFTFYFormatter
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Plain ASCII text.\nWith a second line.\r\n",
+        "Tom & Jerry &amp; friends",
+        "terminal \x1b[31mescape",
+        "control\x00 \x7f characters",
+        "Blåbærgrød med fløde",
+        "mojibake: sÃ¥ er det",
+        "",
+    ],
+)
+@pytest.mark.parametrize("fix_line_breaks", [False, True])
+def test_fast_ftfy_formatter_matches_ftfy(text, fix_line_breaks):
+    expected = FTFYFormatter(fix_line_breaks=fix_line_breaks).format(text)
+    assert FastFTFYFormatter(fix_line_breaks=fix_line_breaks).format(text) == expected
@@ -0,0 +1,61 @@
+"""Tests for the fused filter step."""
+
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+from datatrove.data import Document
+from datatrove.pipeline.filters import LambdaFilter, RegexFilter
+from datatrove.pipeline.formatters.base import BaseFormatter
+
+from dfm_processing.data_pipeline.components.fused_filter import FusedFilter
+from dfm_processing.data_pipeline.components.writer import JSONParquetWriter
+
+
+class UpperFormatter(BaseFormatter):
+    name = "upper"
+
+    def format(self, text: str) -> str:
+        return text.upper()
+
+
+def test_fused_filter(tmp_path: Path):
+    documents = [
+        Document(text=text, id=str(i))
+        for i, text in enumerate(["keep me", "short", "drop me", "keep too"])
+    ]
+    fused = FusedFilter(
+        [
+            UpperFormatter(),
+            LambdaFilter(
+                lambda doc: len(doc.text) > 5,
+                exclusion_writer=JSONParquetWriter(str(tmp_path / "short")),
+            ),
+            RegexFilter(
+                "DROP",
+                exclusion_writer=JSONParquetWriter(str(tmp_path / "regex")),
+            ),
+        ]
+    )
+
+    kept = list(fused.run(documents))
+
+    assert [doc.text for doc in kept] == ["KEEP ME", "KEEP TOO"]
+    assert fused.stats["total"].total == 4
+    assert fused.stats["forwarded"].total == 2
+    assert fused.stats["dropped"].total == 2
+    for folder, text in [("short", "SHORT"), ("regex", "DROP ME")]:
+        (path,) = (tmp_path / folder).glob("*.parquet")
+        assert [row["text"] for row in pq.read_table(path).to_pylist()] == [text]
+
+
+def test_fused_filter_rejects_batched_filters():
+    with pytest.raises(ValueError):
+        batched_filter = LambdaFilter(lambda doc: True)
+        batched_filter.batch_size = 2
+        FusedFilter([batched_filter])
+
+
+def test_fused_filter_rejects_other_steps():
+    with pytest.raises(TypeError):
+        FusedFilter([object()])
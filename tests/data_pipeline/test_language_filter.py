@@ -0,0 +1,49 @@
+"""Tests for the language filter."""
+
+import numpy as np
+import pytest
+from datatrove.data import Document
+from datatrove.pipeline.filters import LanguageFilter
+
+from dfm_processing.data_pipeline.components.language_filter import TopLanguageFilter
+
+SCORES = {
+    "da danish text": {"da": 0.9, "no": 0.08, "sv": 0.02},
+    "no norwegian text": {"no": 0.7, "da": 0.3},
+    "?? unclear text": {"da": 0.45, "no": 0.4, "sv": 0.15},
+}
+
+
+class FakeModel:
+    """Stands in for a fastText model, returning the top k of fixed scores."""
+
+    def predict(self, text: str, k: int = 1):
+        scores = sorted(SCORES[text].items(), key=lambda x: x[1], reverse=True)
+        if k > 0:
+            scores = scores[:k]
+        return (
+            tuple(f"__label__{lang}" for lang, _ in scores),
+            np.array([score for _, score in scores]),
+        )
+
+
+def run_filter(language_filter):
+    language_filter.model._model = FakeModel()
+    documents = [Document(text=text, id=str(i)) for i, text in enumerate(SCORES)]
+    return [
+        (document.text, document.metadata)
+        for document in language_filter.run(documents)
+    ]
+
+
+@pytest.mark.parametrize("language_threshold", [0.4, 0.65])
+def test_top_language_filter_matches_language_filter(language_threshold):
+    expected = run_filter(
+        LanguageFilter(languages=["da"], language_threshold=language_threshold)
+    )
+    top_filter = TopLanguageFilter(
+        languages=["da"], language_threshold=language_threshold
+    )
+
+    assert top_filter.model.k == (1 if language_threshold >= 0.5 else -1)
+    assert run_filter(top_filter) == expected
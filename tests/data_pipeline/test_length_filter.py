@@ -0,0 +1,21 @@
+"""Tests for the length filter."""
+
+from datatrove.data import Document
+
+from dfm_processing.data_pipeline.components.length_filter import LengthFilter
+
+
+def test_length_filter():
+    texts = ["a", "abc", "abcde", "abcdefg"]
+    documents = [Document(text=text, id=str(i)) for i, text in enumerate(texts)]
+    length_filter = LengthFilter(min_chars=3, max_chars=5)
+
+    kept = [document.text for document in length_filter.run(documents)]
+    assert kept == ["abc", "abcde"]
+    assert length_filter.stats["dropped_too_short"].total == 1
+    assert length_filter.stats["dropped_too_long"].total == 1
+
+
+def test_length_filter_no_max():
+    length_filter = LengthFilter(min_chars=1)
+    assert length_filter.filter(Document(text="a" * 10_000_000, id="0"))
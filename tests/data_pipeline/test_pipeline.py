@@ -1,12 +1,18 @@
 import pytest
 
+import dfm_processing.data_pipeline.pipeline as pipeline_module
+
 # Import functions to be tested.
 from dfm_processing.data_pipeline.pipeline import (
     filter_pipeline,
     build_executor,
 )
 from dfm_processing.data_pipeline.config import ExecutorConfig, Dataset
-from dfm_processing.data_pipeline.deduplication import sentence_deduplication
+from dfm_processing.data_pipeline.deduplication import (
+    minhash_deduplication,
+    sentence_deduplication,
+)
+from dfm_processing.data_pipeline.components.exact_dedup import ExactDedupFilter
 
 # Import pipeline step classes for type-checking and attribute inspection.
 from datatrove.pipeline.readers.base import BaseDiskReader
@@ -27,7 +33,7 @@ from datatrove.utils.typeshelper import Languages
 # ===========================
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def dataset():
     dataset = {
         "name": "test",
@@ -63,15 +69,44 @@ def test_filter_pipeline(dataset: Dataset):
     assert isinstance(writer, DiskWriter)
     writer_path = writer.output_folder.path
     assert writer_path == f"{dataset.output_dir}/filter_output"
+    assert writer.batch_size == pipeline_module.OUTPUT_BATCH_SIZE
+
+    # Exclusion writers use small row groups.
+    exclusion_writers = [
+        step.exclusion_writer
+        for fused_step in pipeline
+        for step in getattr(fused_step, "steps", [fused_step])
+        if getattr(step, "exclusion_writer", None) is not None
+    ]
+    assert len(exclusion_writers) > 0
+    assert all(
+        writer.row_group_size == pipeline_module.EXCLUSION_ROW_GROUP_SIZE
+        for writer in exclusion_writers
+    )
+
+
+def test_ensure_nltk_runs_once(mocker):
+    mocker.patch.object(pipeline_module, "_NLTK_READY", False)
+    mocker.patch.object(pipeline_module, "_DANISH_STOPWORDS", frozenset())
+    stopwords = mocker.patch("nltk.corpus.stopwords", new=mocker.MagicMock())
+    stopwords.words.return_value = ["og", "i"]
+    find = mocker.patch("nltk.data.find", side_effect=LookupError)
+    download = mocker.patch("nltk.download")
+
+    assert pipeline_module._ensure_nltk() == frozenset(["og", "i"])
+    assert pipeline_module._ensure_nltk() == frozenset(["og", "i"])
+
+    assert find.call_count == download.call_count == 3
+    stopwords.words.assert_called_once_with("danish")
 
 
 def test_filter_pipeline_empty_paths(dataset: Dataset):
     """
     Edge case: Test that filter_pipeline handles empty strings for paths.
     """
-    dataset.input_dir = ""
-    dataset.output_dir = ""
-    dataset.exclusion_dir = ""
+    dataset = dataset.model_copy(
+        update={"input_dir": "", "output_dir": "", "exclusion_dir": ""}
+    )
 
     with pytest.raises(ValueError):
         filter_pipeline(dataset)
@@ -81,7 +116,7 @@ def test_filter_pipeline_empty_glob_pattern(dataset: Dataset):
     """
     Edge case: Test that filter_pipeline handles empty strings for paths.
     """
-    dataset.glob_pattern = ""
+    dataset = dataset.model_copy(update={"glob_pattern": ""})
 
     with pytest.raises(ValueError):
         filter_pipeline(dataset)
@@ -109,7 +144,9 @@ def test_sent_dedup():
 
     # Validate dedup_sigs (list of SentenceDedupSignature).
     assert isinstance(dedup_sigs, list)
-    assert len(dedup_sigs) == 2
+    assert len(dedup_sigs) == 3
+    assert isinstance(dedup_sigs[1], ExactDedupFilter)
+    assert dedup_sigs[1].exclusion_writer is None
     sig = dedup_sigs[-1]
     assert isinstance(sig, SentenceDedupSignature)
     assert sig.output_folder.path == f"{dedup_dir}/sigs"
@@ -130,25 +167,32 @@ def test_sent_dedup():
     # Ensure the same configuration object is used.
     assert find_dup.config == config
 
-    # Validate filter_dedup (list of 3 steps: ParquetReader, SentenceDedupFilter, ParquetWriter).
+    # Validate filter_dedup (list of 4 steps: ParquetReader, ExactDedupFilter, SentenceDedupFilter, ParquetWriter).
     assert isinstance(filter_dedup, list)
-    assert len(filter_dedup) == 3
+    assert len(filter_dedup) == 4
 
     # Step 1: ParquetReader.
     reader = filter_dedup[0]
     assert isinstance(reader, BaseDiskReader)
     assert reader.data_folder.path == filter_dir
 
-    # Step 2: SentenceDedupFilter.
-    dedup_filter = filter_dedup[1]
+    # Step 2: ExactDedupFilter.
+    exact_filter = filter_dedup[1]
+    assert isinstance(exact_filter, ExactDedupFilter)
+    assert exact_filter.exclusion_writer.output_folder.path == (
+        f"{exclusion_dir}/exact_dedup"
+    )
+
+    # Step 3: SentenceDedupFilter.
+    dedup_filter = filter_dedup[2]
     assert isinstance(dedup_filter, SentenceDedupFilter)
     assert dedup_filter.data_folder.path == f"{dedup_dir}/dups"
     exclusion_writer = dedup_filter.exclusion_writer
     assert isinstance(exclusion_writer, DiskWriter)
     assert exclusion_writer.output_folder.path == f"{exclusion_dir}/sent_dedup"
 
-    # Step 3: ParquetWriter.
-    writer = filter_dedup[2]
+    # Step 4: ParquetWriter.
+    writer = filter_dedup[3]
     assert isinstance(writer, DiskWriter)
     assert writer.output_folder.path == f"{output_dir}/sent_dedup_output"
 
@@ -214,3 +258,11 @@ def test_build_executor_empty_pipeline():
     executor = build_executor(empty_pipeline, logging_dir, config)
     assert isinstance(executor, LocalPipelineExecutor)
     assert executor.pipeline == empty_pipeline
+
+
+def test_minhash_deduplication_uses_xxhash():
+    stage1, *_ = minhash_deduplication("/data", "/dedup", "/output", "/exclusion")
+
+    hash_config = stage1[-1].config.hash_config
+    assert hash_config.hash_fc == "xxhash"
+    assert hash_config.precision == 64
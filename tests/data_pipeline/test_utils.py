@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from dfm_processing.data_pipeline import utils
+
+
+def test_print_pipeline_order(mocker):
+    log_pipeline = mocker.patch.object(utils, "log_pipeline")
+    first = SimpleNamespace(pipeline=["first"], depends=None)
+    second = SimpleNamespace(pipeline=["second"], depends=first)
+    third = SimpleNamespace(pipeline=["third"], depends=second)
+
+    utils.print_pipeline(third)
+
+    assert [call.args[0] for call in log_pipeline.call_args_list] == [
+        ["first"],
+        ["second"],
+        ["third"],
+    ]
+
+
+def test_print_pipeline_long_chain(mocker):
+    """Chains longer than the recursion limit can be printed."""
+    log_pipeline = mocker.patch.object(utils, "log_pipeline")
+    executor = None
+    for i in range(5000):
+        executor = SimpleNamespace(pipeline=[i], depends=executor)
+
+    utils.print_pipeline(executor)
+
+    assert log_pipeline.call_count == 5000
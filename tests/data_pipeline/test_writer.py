@@ -0,0 +1,381 @@
+"""Tests for the custom datatrove writers."""
+
+import json
+import pickle
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from datatrove.data import Document
+
+from dfm_processing.data_pipeline.components.writer import (
+    JSONParquetWriter,
+    NullableArrowIPCWriter,
+    NullableParquetWriter,
+    column_to_array,
+    make_nullable_schema,
+    make_nullable_type,
+)
+
+
+def read_parquet_rows(output_dir: Path) -> list[dict]:
+    """Read every row from the parquet files in `output_dir`."""
+    rows = []
+    for path in sorted(output_dir.glob("*.parquet")):
+        rows.extend(pq.read_table(path).to_pylist())
+    return rows
+
+
+def test_nullable_writer_roundtrip(tmp_path: Path):
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"source": "test"})
+        for i in range(5)
+    ]
+    with NullableParquetWriter(str(tmp_path), batch_size=2) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert all(row["metadata"] == {"source": "test"} for row in rows)
+
+
+def test_nullable_writer_missing_fields(tmp_path: Path):
+    """Fields absent from some documents are written as nulls."""
+    documents = [
+        Document(text="first", id="0", metadata={"source": "test"}),
+        Document(text="second", id="1"),
+        Document(text="third", id="2", metadata={"source": "other"}),
+    ]
+    with NullableParquetWriter(str(tmp_path), batch_size=2) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["text"] for row in rows] == ["first", "second", "third"]
+    assert [row["metadata"] for row in rows] == [
+        {"source": "test"},
+        None,
+        {"source": "other"},
+    ]
+
+
+def test_nullable_writer_partial_batch(tmp_path: Path):
+    """A field first seen part way through a partially filled batch is back-filled."""
+    documents = [
+        Document(text="first", id="0"),
+        Document(text="second", id="1", metadata={"source": "test"}),
+        Document(text="third", id="2"),
+    ]
+    with NullableParquetWriter(str(tmp_path), batch_size=10) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["id"] for row in rows] == ["0", "1", "2"]
+    assert [row["metadata"] for row in rows] == [None, {"source": "test"}, None]
+
+
+def test_nullable_writer_empty_list_field(tmp_path: Path):
+    """A list that is only empty in a later batch keeps the file's inner type."""
+    documents = [
+        Document(text="first", id="0", metadata={"tags": ["a", "b"]}),
+        Document(text="second", id="1", metadata={"tags": [None]}),
+    ]
+    with NullableParquetWriter(str(tmp_path), batch_size=1) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["metadata"]["tags"] for row in rows] == [["a", "b"], [None]]
+
+
+def test_nullable_writer_coalesces_row_groups(tmp_path: Path):
+    """Small batches are collected into row groups of `row_group_size` rows."""
+    documents = [Document(text=f"text {i}", id=str(i)) for i in range(10)]
+    with NullableParquetWriter(str(tmp_path), batch_size=2, row_group_size=4) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    metadata = pq.ParquetFile(path).metadata
+    row_group_sizes = [
+        metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+    ]
+    assert row_group_sizes == [4, 4, 2]
+
+
+def test_nullable_writer_writes_synchronously_by_default(tmp_path: Path):
+    """Without `write_threads`, row groups are written by the calling thread."""
+    with NullableParquetWriter(str(tmp_path), batch_size=2, row_group_size=2) as writer:
+        for i in range(4):
+            writer.write(Document(text=f"text {i}", id=str(i)), rank=0)
+        assert writer._pool is None
+        assert not writer._pending
+
+    assert [row["id"] for row in read_parquet_rows(tmp_path)] == ["0", "1", "2", "3"]
+
+
+def test_nullable_writer_bounds_row_group_bytes(tmp_path: Path):
+    """A row group is written early once `row_group_bytes` are buffered."""
+    documents = [Document(text="x" * 1000, id=str(i)) for i in range(6)]
+    with NullableParquetWriter(
+        str(tmp_path), batch_size=2, row_group_size=100, row_group_bytes=1
+    ) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    metadata = pq.ParquetFile(path).metadata
+    row_group_sizes = [
+        metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+    ]
+    assert row_group_sizes == [2, 2, 2]
+
+
+def test_json_writer_roundtrip(tmp_path: Path):
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"source": "test"})
+        for i in range(5)
+    ]
+    with JSONParquetWriter(str(tmp_path), batch_size=2, row_group_size=4) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert all(json.loads(row["metadata"]) == {"source": "test"} for row in rows)
+
+
+def test_writer_defaults_to_zstd(tmp_path: Path):
+    writer = NullableParquetWriter(str(tmp_path))
+    assert writer.compression == "zstd"
+    assert writer.compression_level == 3
+
+    with writer:
+        writer.write(Document(text="text", id="0"), rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    column = pq.ParquetFile(path).metadata.row_group(0).column(0)
+    assert column.compression == "ZSTD"
+
+
+@pytest.mark.parametrize("compression", ["invalid", {"text": "zstd", "id": "invalid"}])
+def test_writer_invalid_compression(tmp_path: Path, compression):
+    with pytest.raises(ValueError):
+        NullableParquetWriter(str(tmp_path), compression=compression)
+
+
+def test_writer_per_column_compression(tmp_path: Path):
+    with JSONParquetWriter(
+        str(tmp_path),
+        compression={"text": "zstd", "id": "snappy"},
+        compression_level={"text": 5},
+    ) as writer:
+        writer.write(Document(text="text", id="0"), rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    row_group = pq.ParquetFile(path).metadata.row_group(0)
+    codecs = {
+        row_group.column(i).path_in_schema: row_group.column(i).compression
+        for i in range(row_group.num_columns)
+    }
+    assert codecs["text"] == "ZSTD"
+    assert codecs["id"] == "SNAPPY"
+
+
+def test_nullable_writer_multiple_files(tmp_path: Path):
+    """Interleaved documents for different files end up in the right file, in order."""
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"shard": str(i % 2)})
+        for i in range(20)
+    ]
+    writer = NullableParquetWriter(
+        str(tmp_path),
+        output_filename="${rank}_${shard}.parquet",
+        batch_size=2,
+        row_group_size=4,
+        write_threads=2,
+    )
+    # The writer is shipped to workers before running, so it must stay picklable.
+    writer = pickle.loads(pickle.dumps(writer))
+    with writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    for shard in ["0", "1"]:
+        (path,) = tmp_path.glob(f"*_{shard}.parquet")
+        rows = pq.read_table(path).to_pylist()
+        assert [row["id"] for row in rows] == [str(i) for i in range(int(shard), 20, 2)]
+
+
+def test_make_nullable_schema():
+    schema = pa.schema(
+        [
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("tags", pa.list_(pa.null())),
+            pa.field(
+                "meta", pa.struct([pa.field("pages", pa.int64(), nullable=False)])
+            ),
+        ]
+    )
+    nullable = make_nullable_schema(schema)
+
+    assert all(field.nullable for field in nullable)
+    assert nullable.field("tags").type == pa.list_(pa.string())
+    assert nullable.field("meta").type.field("pages").nullable
+
+
+def test_arrow_ipc_writer_roundtrip(tmp_path: Path):
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"source": "test"})
+        for i in range(5)
+    ]
+    with NullableArrowIPCWriter(str(tmp_path), batch_size=2) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    (path,) = tmp_path.glob("*.arrow")
+    with pa.ipc.open_file(path) as reader:
+        rows = reader.read_all().to_pylist()
+    assert [row["id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    assert all(row["metadata"] == {"source": "test"} for row in rows)
+
+
+def test_nullable_writer_encoding_options(tmp_path: Path):
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"score": i / 10})
+        for i in range(5)
+    ]
+    with NullableParquetWriter(
+        str(tmp_path),
+        expand_metadata=True,
+        use_dictionary=["id"],
+        use_byte_stream_split=["score"],
+        write_statistics=False,
+    ) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    row_group = pq.ParquetFile(path).metadata.row_group(0)
+    columns = {
+        row_group.column(i).path_in_schema: row_group.column(i)
+        for i in range(row_group.num_columns)
+    }
+    assert "BYTE_STREAM_SPLIT" in columns["score"].encodings
+    assert "RLE_DICTIONARY" in columns["id"].encodings
+    assert "RLE_DICTIONARY" not in columns["text"].encodings
+    assert not columns["text"].is_stats_set
+
+
+def test_nullable_writer_max_file_size(tmp_path: Path):
+    """No documents are lost when the writer switches to a new file."""
+    documents = [Document(text=f"text {i}", id=str(i)) for i in range(20)]
+    with NullableParquetWriter(
+        str(tmp_path), batch_size=2, row_group_size=2, max_file_size=1
+    ) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["id"] for row in rows] == [str(i) for i in range(20)]
+
+
+@pytest.mark.parametrize(
+    "typ, expected",
+    [
+        (pa.large_list(pa.null()), pa.large_list(pa.string())),
+        (pa.list_(pa.null(), 2), pa.list_(pa.string(), 2)),
+        (
+            pa.map_(pa.string(), pa.field("value", pa.int64(), nullable=False)),
+            pa.map_(pa.string(), pa.int64()),
+        ),
+        (pa.int64(), pa.int64()),
+    ],
+)
+def test_make_nullable_type(typ, expected):
+    assert make_nullable_type(typ) == expected
+
+
+@pytest.mark.parametrize("writer_class", [NullableParquetWriter, JSONParquetWriter])
+def test_writer_intermediate(tmp_path: Path, writer_class):
+    documents = [Document(text=f"text {i}", id=str(i)) for i in range(5)]
+    with writer_class(str(tmp_path), intermediate=True) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+
+    (path,) = tmp_path.glob("*.parquet")
+    parquet_file = pq.ParquetFile(path)
+    column = parquet_file.metadata.row_group(0).column(0)
+    assert not column.is_stats_set
+    assert "RLE_DICTIONARY" not in column.encodings
+    assert parquet_file.schema_arrow.metadata is None
+    assert [row["id"] for row in read_parquet_rows(tmp_path)] == [
+        str(i) for i in range(5)
+    ]
+
+
+def test_nullable_writer_max_open_files(tmp_path: Path):
+    """Files closed to stay under `max_open_files` are continued in a new file."""
+    documents = [
+        Document(text=f"text {i}", id=str(i), metadata={"shard": str(i % 3)})
+        for i in range(30)
+    ]
+    with NullableParquetWriter(
+        str(tmp_path),
+        output_filename="${rank}_${shard}.parquet",
+        batch_size=2,
+        max_open_files=2,
+    ) as writer:
+        for document in documents:
+            writer.write(document, rank=0)
+            assert len(writer.output_mg.get_open_files()) <= 3
+
+    for shard in ["0", "1", "2"]:
+        rows = []
+        for path in sorted(tmp_path.glob(f"*_{shard}.parquet")):
+            rows.extend(pq.read_table(path).to_pylist())
+        assert [row["id"] for row in rows] == [str(i) for i in range(int(shard), 30, 3)]
+
+
+def test_nullable_writer_max_open_files_requires_max_file_size(tmp_path: Path):
+    with pytest.raises(ValueError):
+        NullableParquetWriter(str(tmp_path), max_open_files=2, max_file_size=-1)
+
+
+def test_nullable_writer_fields_after_first_batch(tmp_path: Path):
+    """Once the schema is known, missing fields are null and new fields raise."""
+    with NullableParquetWriter(
+        str(tmp_path), batch_size=1, expand_metadata=True
+    ) as writer:
+        writer.write(Document(text="first", id="0", metadata={"it's": "quoted"}), 0)
+        writer.write(Document(text="second", id="1", metadata={}), 0)
+        with pytest.raises(ValueError, match="extra"):
+            writer.write(Document(text="third", id="2", metadata={"extra": 1}), 0)
+
+    rows = read_parquet_rows(tmp_path)
+    assert [row["it's"] for row in rows] == ["quoted", None]
+
+
+@pytest.mark.parametrize(
+    "values, typ",
+    [
+        ([1, 2, 3], pa.int64()),
+        ([1, None, 3], pa.int64()),
+        ([0.5, 2, 3.5], pa.float64()),
+        ([1, 2, 3], pa.int32()),
+        (["a", "b", None], pa.string()),
+    ],
+)
+def test_column_to_array(values, typ):
+    array = column_to_array(values, typ)
+    assert array.type == typ
+    assert array.to_pylist() == values
+
+
+def test_column_to_array_wrong_type():
+    """Values numpy would silently convert are still rejected by Arrow."""
+    with pytest.raises(pa.ArrowException):
+        column_to_array([True, False], pa.int64())
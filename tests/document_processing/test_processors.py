@@ -5,9 +5,13 @@ import json
 from pathlib import Path
 from unittest.mock import MagicMock
 import gzip
+import threading
 
+import orjson
 from pytest_mock import MockerFixture
 
+from dfm_processing.document_processing import processors
+
 # Import the processing functions
 from dfm_processing.document_processing.processors import (
     process_json,
@@ -18,13 +22,14 @@ from dfm_processing.document_processing.processors import (
     process_word_old,
     process_file,
     process_files,
+    open_gzip_writer,
 )
 
 
 # Helper function to read gzipped JSONL
 def read_gzipped_jsonl(path):
-    with gzip.open(path, "rt") as f:
-        return [json.loads(line) for line in f]
+    lines = gzip.decompress(Path(path).read_bytes()).splitlines()
+    return [orjson.loads(line) for line in lines if line]
 
 
 ### Tests for process_json ###
@@ -55,6 +60,29 @@ def test_process_json_html_formatting(tmp_path: Path, mocker: MockerFixture):
     assert jsonl["text"] == "Hello World"
 
 
+def test_process_json_nested_lists(tmp_path: Path):
+    data = [
+        {"docs": [{"text": "first"}, {"text": ["second", 3]}]},
+        [{"docs": {"text": {"nested": "object"}}}],
+    ]
+    file_path = tmp_path / "test.json"
+    file_path.write_text(json.dumps(data))
+
+    result = process_json(file_path, "test_source", text_path="docs,text")
+    texts = [json.loads(line)["text"] for line in result]  # type: ignore
+    assert texts == ["first", "second", "3", '{"nested": "object"}']
+
+
+def test_process_json_non_standard_json(tmp_path: Path):
+    file_path = tmp_path / "test.json"
+    file_path.write_text(
+        '{"text": "Hello", "score": NaN, "big": 123456789012345678901}'
+    )
+
+    result = process_json(file_path, "test_source", text_path="text")
+    assert json.loads(result[0])["text"] == "Hello"  # type: ignore
+
+
 def test_process_json_missing_key(tmp_path: Path, caplog: pytest.LogCaptureFixture):
     data = {"other": "value"}
     file_path = tmp_path / "test.json"
@@ -100,6 +128,19 @@ def test_process_html_extraction(tmp_path: Path):
     assert jsonl["text"] == "Test"
 
 
+def test_process_html_latin1(tmp_path: Path):
+    html_content = (
+        '<html><head><meta charset="iso-8859-1"></head>'
+        "<body><p>Blåbærgrød med fløde</p></body></html>"
+    )
+    file_path = tmp_path / "test.html"
+    file_path.write_bytes(html_content.encode("latin-1"))
+
+    result = process_html(file_path, "test_source")
+    jsonl = json.loads(result)  # type: ignore
+    assert jsonl["text"] == "Blåbærgrød med fløde"
+
+
 ### Tests for process_epub ###
 def test_process_epub_file(tmp_path: Path, mocker: MockerFixture):
     mocker.patch(
@@ -140,14 +181,16 @@ def test_process_word_old(tmp_path: Path, mocker: MockerFixture):
 
 ### Tests for process_file ###
 def test_process_file_dispatch(mocker: MockerFixture):
-    mocker.patch(
-        "dfm_processing.document_processing.processors.process_document",
-        return_value='{"text": "doc"}',
-    )
+    process_document = mocker.MagicMock(return_value='{"text": "doc"}')
+    mocker.patch.dict(processors.PROCESSORS_BY_SUFFIX, {".pdf": process_document})
     file = Path("test.pdf")
     result = process_file(file, "source")
     assert json.loads(result)["text"] == "doc"  # type: ignore
 
+    # Suffixes are matched case-insensitively.
+    assert process_file(Path("TEST.PDF"), "source") == result
+    assert process_document.call_count == 2
+
 
 def test_process_file_unsupported(caplog: pytest.LogCaptureFixture):
     file = Path("test.unknown")
@@ -171,3 +214,88 @@ def test_process_files_integration(tmp_path: Path, mocker: MockerFixture):
     assert output_file.exists()
     data = read_gzipped_jsonl(output_file)
     assert [d["text"] for d in data] == ["file1.txt", "file2.html"]
+
+
+def test_process_files_threads(tmp_path: Path, mocker: MockerFixture):
+    mocker.patch(
+        "dfm_processing.document_processing.processors.process_file",
+        side_effect=lambda f, s, **kw: json.dumps({"text": f.name}),
+    )
+    parallel = mocker.spy(processors, "Parallel")
+    files = [Path("file1.txt"), Path("file2.html")]
+
+    process_files(files, tmp_path / "output", "client", n_workers=2)
+
+    assert parallel.call_args.kwargs["backend"] == "threading"
+    data = read_gzipped_jsonl(tmp_path / "output" / "client.jsonl.gz")
+    assert sorted(d["text"] for d in data) == ["file1.txt", "file2.html"]
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_open_gzip_writer(tmp_path: Path, mocker: MockerFixture, threads: int):
+    # A stand-in for pigz that ignores the thread count.
+    pigz = tmp_path / "pigz"
+    pigz.write_text('#!/bin/sh\nexec gzip -c "$1"\n')
+    pigz.chmod(0o755)
+    mocker.patch("shutil.which", return_value=str(pigz))
+    popen = mocker.spy(processors.subprocess, "Popen")
+    output_file = tmp_path / "out.jsonl.gz"
+
+    with open_gzip_writer(output_file, threads=threads) as out_file:
+        out_file.write(b'{"text": "a"}\n{"text": "b"}\n')
+
+    assert read_gzipped_jsonl(output_file) == [{"text": "a"}, {"text": "b"}]
+    assert popen.call_count == (0 if threads == 1 else 1)
+
+
+def test_open_gzip_writer_pigz_fails(tmp_path: Path, mocker: MockerFixture):
+    mocker.patch("shutil.which", return_value="false")
+
+    with (
+        pytest.raises(OSError),
+        open_gzip_writer(tmp_path / "out.jsonl.gz", threads=4) as out_file,
+    ):
+        out_file.write(b"data")
+
+
+def test_thread_document_converter(mocker: MockerFixture):
+    mocker.patch.object(
+        processors, "build_document_converter", side_effect=lambda: object()
+    )
+    mocker.patch.object(processors, "_THREAD_STATE", threading.local())
+
+    converter = processors.thread_document_converter()
+    assert processors.thread_document_converter() is converter
+
+    # Another thread builds its own converter.
+    other = []
+    thread = threading.Thread(
+        target=lambda: other.append(processors.thread_document_converter())
+    )
+    thread.start()
+    thread.join()
+    assert other[0] is not converter
+
+
+def test_process_files_cache(tmp_path: Path, mocker: MockerFixture):
+    process_file = mocker.patch(
+        "dfm_processing.document_processing.processors.process_file",
+        side_effect=lambda f, s, **kw: json.dumps({"text": f.read_text()}),
+    )
+    files = [tmp_path / "file1.txt", tmp_path / "file2.txt"]
+    for file in files:
+        file.write_text(file.name)
+    cache_dir = tmp_path / "cache"
+
+    def run() -> list[str]:
+        output = tmp_path / "output.jsonl.gz"
+        process_files(files, output, "client", n_workers=1, cache_dir=cache_dir)
+        return sorted(d["text"] for d in read_gzipped_jsonl(output))
+
+    assert run() == ["file1.txt", "file2.txt"]
+    assert process_file.call_count == 2
+
+    # Only the changed file is processed again.
+    files[1].write_text("changed")
+    assert run() == ["changed", "file1.txt"]
+    assert process_file.call_count == 3
@@ -1,14 +1,21 @@
 """Unit tests for document processor utils."""
 
+import json
+
 from docling.document_converter import DocumentConverter
 from pathlib import Path
 
+import pandas as pd
+
 
 from dfm_processing.document_processing.utils import (
     JSONL,
     build_document_converter,
     create_JSONL,
+    dataframe_to_markdown,
+    dump_JSONL,
     build_metadata,
+    find_near_duplicates,
     generate_decode_url,
     make_unique,
 )
@@ -83,3 +90,57 @@ def test_single_param_no_ampersand():
 def test_invalid_param_format():
     link = "https://safelink.example.com?invalidparam&url=http%3A%2F%2Fexample.com"
     assert generate_decode_url(link) is None
+
+
+def test_dump_JSONL():
+    jsonl = create_JSONL(
+        text="Hej æøå",
+        source="Test",
+        metadata={"filename": "test.pdf", 1: "one"},
+    )
+    data = json.loads(dump_JSONL(jsonl))
+
+    assert data["text"] == "Hej æøå"
+    assert data["id"] == "Test-test.pdf"
+    assert data["metadata"] == {"filename": "test.pdf", "1": "one"}
+    assert "æøå" in dump_JSONL(jsonl)
+
+
+def test_find_near_duplicates():
+    df = pd.DataFrame(
+        [["a", "a", "x", None], ["b", "b", "y", None], ["c", "d", "z", None]],
+        columns=["first", "second", "third", "empty"],
+    )
+
+    assert find_near_duplicates(df, 0.6) == [("first", "second")]
+    assert find_near_duplicates(df, 0.7) == []
+    # Missing values are never identical.
+    assert find_near_duplicates(df[["empty", "empty"]], 0.1) == []
+    assert find_near_duplicates(df.iloc[:0]) == []
+
+
+def test_dataframe_to_markdown():
+    df = pd.DataFrame({"name": ["a", "bb"], "value": [1.5, 3.0]})
+
+    assert dataframe_to_markdown(df) == (
+        "| name | value |\n|---|---|\n| a | 1.5 |\n| bb | 3 |"
+    )
+
+
+def test_dataframe_to_markdown_keeps_strings_and_missing_values():
+    df = pd.DataFrame(
+        {
+            "code": pd.Series(["007", None], dtype=object),
+            "value": [float("nan"), 2.0],
+        }
+    )
+
+    assert dataframe_to_markdown(df) == (
+        "| code | value |\n|---|---|\n| 007 | nan |\n|  | 2 |"
+    )
+
+
+def test_dataframe_to_markdown_pipe_fallback():
+    df = pd.DataFrame({"name": ["a|b"]})
+
+    assert dataframe_to_markdown(df) == df.to_markdown(index=False, tablefmt="github")